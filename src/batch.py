@@ -0,0 +1,332 @@
+"""
+Offline batch renderer. Renders an animation described in a JSON scene
+file on a pool of processes and writes the frames in order.
+
+    python src/batch.py scene.json -o frames/frame_{:06d}.png
+    python src/batch.py scene.json -o turntable.y4m --workers 8
+
+Running the same command again resumes an interrupted render: PNG frames
+that exist are skipped and y4m / raw streams continue after their last
+complete frame.
+"""
+import os
+
+# Frames are drawn into plain surfaces, no display is needed
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import argparse
+import json
+import math
+import multiprocessing
+import signal
+import sys
+import time
+from collections import deque
+import numpy as np
+from capture import FORMATS, encode_frame, frame_path, guess_format, stream_header
+from headless import OffscreenRenderer
+from loaders import load_mesh
+from objects import OBJECT_TYPES, create_object
+from scene import SceneNode
+
+# Renderer3D options a scene's "settings" may set
+SETTINGS = ("line_width", "show_vertices", "vertex_size", "antialiasing", "hidden_line_removal",
+            "backface_culling", "frustum_culling", "level_of_detail", "wireframe_color",
+            "vertex_color", "background_color")
+
+# Keyframe channels and their values until a keyframe sets them
+OBJECT_CHANNELS = {"translation": (0, 0, 0), "rotation": (0, 0, 0), "scale": (1, 1, 1)}
+CAMERA_CHANNELS = {"position": (0, 0, -8), "rotation": (0, 0, 0)}
+
+# Frames submitted to the pool per worker ahead of the one being written
+FRAMES_AHEAD = 2
+
+
+class KeyframeTrack:
+    """
+    Piecewise linear animation of named 3-vectors. Keyframes are dicts
+    with a "frame" (0 when left out) and any subset of the channels; each
+    channel is interpolated between the keyframes that set it and held
+    before the first and after the last. Rotations are Euler degrees
+    interpolated as plain numbers, so 0 to 360 is one full turn.
+    """
+
+    def __init__(self, keyframes, channels):
+        self.channels = {}
+        for name, default in channels.items():
+            keys = sorted((float(k.get("frame", 0)), k[name]) for k in keyframes if name in k)
+            if not keys:
+                keys = [(0.0, default)]
+            frames = np.array([frame for frame, _ in keys])
+            values = np.array([value for _, value in keys], dtype=np.float64)
+            if values.shape != (len(keys), 3):
+                raise ValueError(f"Keyframe {name!r} values must be [x, y, z]")
+            self.channels[name] = (frames, values)
+
+    def sample(self, frame: float) -> dict:
+        """Channel name -> (x, y, z) at a frame"""
+        return {
+            name: tuple(float(np.interp(frame, frames, values[:, i])) for i in range(3))
+            for name, (frames, values) in self.channels.items()
+        }
+
+
+class BatchScene:
+    """
+    Parsed scene description. Only plain data is kept, so it pickles
+    cheaply to the workers, which build the geometry themselves.
+
+        {
+          "resolution": [1280, 720],
+          "projection": "perspective",
+          "fov": 60,
+          "fps": 30,
+          "frames": [0, 240],
+          "settings": {"hidden_line_removal": true, "show_vertices": false},
+          "camera": {"position": [0, 2, -8], "rotation": [10, 0, 0]},
+          "objects": [
+            {"type": "torus", "params": {"major_radius": 1.5},
+             "keyframes": [{"frame": 0, "rotation": [30, 0, 0]},
+                           {"frame": 240, "rotation": [30, 360, 0]}]},
+            {"mesh": "models/bunny.obj", "translation": [3, 0, 0]}
+          ]
+        }
+
+    frames is a [start, end) range. Objects are a built-in "type" with
+    optional "params" or a "mesh" file relative to the scene file; either
+    may give static translation / rotation / scale or "keyframes". The
+    camera takes position / rotation or "keyframes" the same way.
+    """
+
+    def __init__(self, description: dict, base_dir: str = ""):
+        self.width, self.height = (int(v) for v in description.get("resolution", (1024, 768)))
+        self.projection = description.get("projection", "perspective")
+        if self.projection not in ("orthographic", "perspective"):
+            raise ValueError(f"Unknown projection {self.projection!r}")
+        self.fov = float(description.get("fov", 60))
+        self.fps = int(description.get("fps", 30))
+        self.frame_start, self.frame_end = (int(v) for v in description.get("frames", (0, 1)))
+
+        self.settings = {}
+        for name, value in description.get("settings", {}).items():
+            if name not in SETTINGS:
+                raise ValueError(f"Unknown setting {name!r}, expected one of {SETTINGS}")
+            self.settings[name] = tuple(value) if isinstance(value, list) else value
+
+        camera = description.get("camera", {})
+        self.camera_track = KeyframeTrack(camera.get("keyframes", [camera]), CAMERA_CHANNELS)
+
+        self.objects = []
+        for entry in description.get("objects", []):
+            if "mesh" in entry:
+                source = ("mesh", os.path.join(base_dir, entry["mesh"]), {})
+            else:
+                object_type = entry.get("type", "cube")
+                if object_type.lower() not in OBJECT_TYPES:
+                    raise ValueError(f"Unknown object type {object_type!r}, "
+                                     f"expected one of {tuple(OBJECT_TYPES)}")
+                source = ("type", object_type, entry.get("params", {}))
+            track = KeyframeTrack(entry.get("keyframes", [entry]), OBJECT_CHANNELS)
+            self.objects.append((source, track))
+
+    @classmethod
+    def load(cls, path: str) -> "BatchScene":
+        with open(path) as f:
+            return cls(json.load(f), os.path.dirname(path))
+
+    @property
+    def frames(self) -> range:
+        return range(self.frame_start, self.frame_end)
+
+
+class SceneRenderer:
+    """Builds a BatchScene's geometry once and renders any of its frames to RGB"""
+
+    def __init__(self, scene: BatchScene):
+        self.scene = scene
+        self.offscreen = OffscreenRenderer(scene.width, scene.height)
+        renderer = self.offscreen.renderer
+        for name, value in scene.settings.items():
+            setattr(renderer, name, value)
+        renderer.perspective.fov = math.radians(scene.fov)
+
+        self.root = SceneNode("Root")
+        self.nodes = []
+        for (kind, source, params), track in scene.objects:
+            obj = load_mesh(source) if kind == "mesh" else create_object(source, **params)
+            self.nodes.append((self.root.add_child(SceneNode(obj.name, obj)), track))
+        self._rgb = np.empty((scene.height, scene.width, 3), dtype=np.uint8)
+
+    def render(self, frame: int) -> np.ndarray:
+        """(height, width, 3) RGB image of a frame, overwritten by the next call"""
+        for node, track in self.nodes:
+            pose = track.sample(frame)
+            node.transform.set_translation(*pose["translation"])
+            node.transform.set_rotation(*pose["rotation"])
+            node.transform.set_scale(*pose["scale"])
+        camera = self.offscreen.renderer.camera
+        pose = self.scene.camera_track.sample(frame)
+        camera.position.x, camera.position.y, camera.position.z = pose["position"]
+        camera.rotation.x, camera.rotation.y, camera.rotation.z = pose["rotation"]
+        # LOD hysteresis would make a frame depend on the frames this worker
+        # drew before it, start every frame from a clean slate
+        self.offscreen.renderer.reset_lod_history()
+        return self.offscreen.render_array(self.root, projection=self.scene.projection,
+                                           out=self._rgb)
+
+
+# Per-process renderer, set up once by the pool initializer
+_worker = None
+
+
+def _init_worker(scene: BatchScene, format: str):
+    global _worker
+    # Ctrl-C reaches the whole process group, only the parent should act
+    # on it; it terminates the pool
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _worker = (SceneRenderer(scene), format)
+
+
+def _render_frame(frame: int) -> bytes:
+    """Pool worker: render and encode one frame"""
+    renderer, format = _worker
+    return encode_frame(renderer.render(frame), format)
+
+
+class FrameWriter:
+    """
+    Writes encoded frames of a frame range in order, picking up where an
+    earlier run stopped. PNG frames are written under a temporary name and
+    renamed, so a frame file exists only once it is complete. Streams are
+    cut back to their last complete frame and appended to, which assumes
+    the earlier run used the same scene and frame range.
+    """
+
+    def __init__(self, path: str, format: str, scene: BatchScene, restart: bool = False):
+        self.path = path
+        self.format = format
+        self.frames = scene.frames
+        self._stream = None
+        if format == "png":
+            directory = os.path.dirname(frame_path(path, 0))
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self.pending = [frame for frame in self.frames
+                            if restart or not os.path.exists(frame_path(path, frame))]
+            return
+
+        header = stream_header(format, (scene.width, scene.height), scene.fps)
+        frame_size = len(encode_frame(np.zeros((scene.height, scene.width, 3), np.uint8), format))
+        done = 0
+        if not restart and os.path.exists(path):
+            with open(path, "rb") as f:
+                if f.read(len(header)) != header:
+                    raise ValueError(f"{path} was not written for this scene, "
+                                     "pass --restart to overwrite it")
+            size = os.path.getsize(path) - len(header)
+            done = min(size // frame_size, len(self.frames))
+        self._stream = open(path, "r+b" if done else "wb")
+        # Drop a frame cut off by the interruption
+        self._stream.truncate(len(header) + done * frame_size)
+        self._stream.seek(0)
+        self._stream.write(header)
+        self._stream.seek(len(header) + done * frame_size)
+        self.pending = list(self.frames[done:])
+
+    def write(self, frame: int, data: bytes):
+        if self._stream is not None:
+            self._stream.write(data)
+            return
+        final_path = frame_path(self.path, frame)
+        temporary_path = final_path + ".part"
+        with open(temporary_path, "wb") as f:
+            f.write(data)
+        os.replace(temporary_path, final_path)
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.close()
+
+
+def render_frames(scene: BatchScene, frames, format: str, workers: int):
+    """
+    Yield (frame, encoded bytes) in frame order. Up to FRAMES_AHEAD frames
+    per worker are in flight at once, so a slow writer never piles up
+    finished frames in memory.
+    """
+    if workers <= 0:
+        renderer = SceneRenderer(scene)
+        for frame in frames:
+            yield frame, encode_frame(renderer.render(frame), format)
+        return
+
+    pool = multiprocessing.Pool(workers, initializer=_init_worker, initargs=(scene, format))
+    try:
+        in_flight = deque()
+        frames = iter(frames)
+        for frame in frames:
+            in_flight.append((frame, pool.apply_async(_render_frame, (frame,))))
+            if len(in_flight) >= workers * FRAMES_AHEAD:
+                frame, result = in_flight.popleft()
+                yield frame, result.get()
+        while in_flight:
+            frame, result = in_flight.popleft()
+            yield frame, result.get()
+        pool.close()
+    finally:
+        # Stops the workers right away when rendering was interrupted
+        pool.terminate()
+        pool.join()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Render a JSON scene to PNG frames or a video stream")
+    parser.add_argument("scene", help="scene description, see BatchScene")
+    parser.add_argument("-o", "--output", default="frames/frame_{:06d}.png",
+                        help="PNG path with a {} frame field, or a .y4m / .rgb stream")
+    parser.add_argument("--format", choices=FORMATS, help="defaults to the output's extension")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count(),
+                        help="render on this many processes, 0 for this one")
+    parser.add_argument("--start", type=int, help="first frame, overrides the scene")
+    parser.add_argument("--end", type=int, help="frame to stop before, overrides the scene")
+    parser.add_argument("--restart", action="store_true",
+                        help="render every frame again instead of resuming")
+    args = parser.parse_args(argv)
+
+    scene = BatchScene.load(args.scene)
+    if args.start is not None:
+        scene.frame_start = args.start
+    if args.end is not None:
+        scene.frame_end = args.end
+    format = args.format or guess_format(args.output)
+    writer = FrameWriter(args.output, format, scene, args.restart)
+
+    total = len(writer.pending)
+    skipped = len(scene.frames) - total
+    if skipped:
+        print(f"Resuming, {skipped} of {len(scene.frames)} frames already written", file=sys.stderr)
+
+    written = 0
+    start = last_report = time.perf_counter()
+    rendered = render_frames(scene, writer.pending, format, args.workers)
+    try:
+        for frame, data in rendered:
+            writer.write(frame, data)
+            written += 1
+            now = time.perf_counter()
+            if now - last_report >= 1 or written == total:
+                last_report = now
+                rate = written / (now - start)
+                print(f"frame {frame}: {written}/{total}, {rate:.1f} fps, "
+                      f"{(total - written) / rate:.0f} s left", file=sys.stderr)
+    except KeyboardInterrupt:
+        print(f"\nInterrupted after {written} frames, run again to resume", file=sys.stderr)
+        return 130
+    finally:
+        rendered.close()
+        writer.close()
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,258 @@
+"""
+Rendering benchmark suite with a per-stage breakdown.
+
+    python src/benchmark.py run -o results.json
+    python src/benchmark.py compare baseline.json results.json
+"""
+import os
+
+# The HUD stage needs GUI, which opens a display, so fall back to SDL's
+# dummy video driver when nothing else was requested
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import argparse
+import json
+import math
+import platform
+import statistics
+import sys
+import time
+import numpy as np
+import pygame
+from objects import Object3D, create_object
+from transformations import Transform, TransformManager
+from renderer import Renderer3D
+
+# Edge counts of the synthetic grid meshes
+SYNTHETIC_EDGE_COUNTS = [1_000, 10_000, 100_000, 1_000_000]
+
+PRIMITIVES = {
+    "cube": {"size": 2.0},
+    "pyramid": {"base_size": 2.0, "height": 2.0},
+    "tetrahedron": {"size": 1.5},
+    "octahedron": {"size": 1.5},
+}
+
+# Differences below this are timer noise and never count as regressions
+MIN_SIGNIFICANT_MS = 0.05
+
+
+def create_grid_mesh(target_edges: int) -> Object3D:
+    """Deterministic wavy grid with roughly target_edges edges"""
+    # An n x n vertex grid has 2 * n * (n - 1) edges
+    n = max(2, math.ceil(math.sqrt(target_edges / 2)) + 1)
+    coords = np.linspace(-2.0, 2.0, n)
+    x, y = np.meshgrid(coords, coords, indexing="ij")
+    z = 0.3 * np.sin(3 * x) * np.cos(3 * y)
+    vertices = np.stack([x.ravel(), y.ravel(), z.ravel()], axis=1)
+
+    index = np.arange(n * n).reshape(n, n)
+    horizontal = np.stack([index[:, :-1].ravel(), index[:, 1:].ravel()], axis=1)
+    vertical = np.stack([index[:-1, :].ravel(), index[1:, :].ravel()], axis=1)
+    edges = np.concatenate([horizontal, vertical])[:target_edges]
+    # Quads for the depth buffer stages
+    quads = np.stack([index[:-1, :-1], index[:-1, 1:], index[1:, 1:], index[1:, :-1]], axis=-1)
+
+    obj = Object3D.from_arrays(f"Grid{target_edges}", vertices, edges)
+    obj.set_faces(np.arange(0, quads.size + 1, 4), quads.ravel())
+    return obj
+
+
+def benchmark_meshes(max_edges: int):
+    """Yield (name, object) for every mesh in the suite"""
+    for object_type, params in PRIMITIVES.items():
+        yield object_type, create_object(object_type, **params)
+    for edge_count in SYNTHETIC_EDGE_COUNTS:
+        if edge_count <= max_edges:
+            yield f"grid_{edge_count}", create_grid_mesh(edge_count)
+
+
+def time_stage(stage, repeats: int, warmup: int = 1) -> dict:
+    """Run stage() warmup + repeats times and summarize the timed runs in ms"""
+    for _ in range(warmup):
+        stage()
+
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        stage()
+        samples.append((time.perf_counter() - start) * 1000)
+
+    return {
+        "median_ms": statistics.median(samples),
+        "min_ms": min(samples),
+        "max_ms": max(samples),
+        "repeats": repeats,
+    }
+
+
+def benchmark_object(obj: Object3D, renderer: Renderer3D, surface, repeats: int) -> dict:
+    """Time each pipeline stage separately for one object"""
+    transform = Transform()
+    transform.set_rotation(30, 45, 0)
+    transform_manager = TransformManager()
+    transform_manager.add_transform(transform)
+
+    vertex_array = obj.vertex_array
+    model = transform_manager.get_combined_matrix().matrix
+    mvp = renderer.orthographic.view_projection_matrix() @ model
+    perspective_mvp = renderer.perspective.view_projection_matrix() @ model
+    clip_vertices = renderer.vertex_buffer.transform(vertex_array, mvp).copy()
+    perspective_clip_vertices = vertex_array @ perspective_mvp.T
+    points, valid = renderer.orthographic.project_array(clip_vertices)
+    edges = obj.edge_array
+    edges = edges[valid[edges[:, 0]] & valid[edges[:, 1]]]
+    starts, ends = points[edges[:, 0]], points[edges[:, 1]]
+    visible_points = points[valid]
+    keys = renderer.orthographic.depth_keys(clip_vertices)
+    triangles = obj.triangle_array
+    depth_buffer = renderer.depth_buffer
+
+    def fill_depth_buffer():
+        depth_buffer.clear(surface.get_size())
+        depth_buffer.rasterize(points, keys, triangles)
+
+    stages = {
+        "transform": lambda: transform_manager.apply_to_array(vertex_array),
+        "projection_orthographic": lambda: renderer.orthographic.project_array(clip_vertices),
+        "projection_perspective": lambda: renderer.perspective.project_array(
+            perspective_clip_vertices
+        ),
+        "rasterization": lambda: renderer.line_renderer.draw_lines(
+            surface, starts, ends, renderer.wireframe_color, renderer.line_width
+        ),
+        "rasterization_thick": lambda: renderer.line_renderer.draw_lines(
+            surface, starts, ends, renderer.wireframe_color, 3
+        ),
+        "rasterization_antialiased": lambda: renderer.line_renderer.draw_lines_antialiased(
+            surface, starts, ends, renderer.wireframe_color, renderer.line_width
+        ),
+        "depth_buffer": fill_depth_buffer,
+        "rasterization_hidden": lambda: renderer.line_renderer.draw_lines_depth_tested(
+            surface, starts, ends, keys[edges], depth_buffer, 0.0,
+            renderer.wireframe_color, renderer.line_width
+        ),
+        "vertex_markers": lambda: renderer.draw_vertices(surface, visible_points),
+    }
+    return {name: time_stage(stage, repeats) for name, stage in stages.items()}
+
+
+def benchmark_hud(width: int, height: int, repeats: int) -> dict:
+    # Imported lazily, GUI opens a (dummy) display on construction
+    from gui import GUI
+
+    gui = GUI(width, height)
+    try:
+        return time_stage(gui.draw_ui, repeats)
+    finally:
+        pygame.quit()
+
+
+def run(args) -> int:
+    renderer = Renderer3D(args.width, args.height)
+    renderer.set_parallel_rasterization(args.workers)
+    surface = pygame.Surface((args.width, args.height))
+
+    results = []
+    for name, obj in benchmark_meshes(args.max_edges):
+        print(f"{name}: {obj.vertex_count} vertices, {obj.edge_count} edges", file=sys.stderr)
+        for stage, timing in benchmark_object(obj, renderer, surface, args.repeats).items():
+            results.append({
+                "mesh": name,
+                "stage": stage,
+                "vertices": obj.vertex_count,
+                "edges": obj.edge_count,
+                **timing,
+            })
+    renderer.set_parallel_rasterization(0)
+
+    if not args.no_hud:
+        results.append({"mesh": "-", "stage": "hud",
+                        **benchmark_hud(args.width, args.height, args.repeats)})
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pygame": pygame.version.ver,
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+            "resolution": [args.width, args.height],
+            "repeats": args.repeats,
+            "workers": args.workers,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print_table(results)
+    print(f"Results written to {args.output}", file=sys.stderr)
+    return 0
+
+
+def print_table(results):
+    print(f"{'mesh':<18}{'stage':<26}{'median ms':>12}{'min ms':>12}")
+    for entry in results:
+        print(f"{entry['mesh']:<18}{entry['stage']:<26}"
+              f"{entry['median_ms']:>12.3f}{entry['min_ms']:>12.3f}")
+
+
+def compare(args) -> int:
+    """Compare two result files, exit status 1 if any stage regressed"""
+    with open(args.baseline) as f:
+        baseline = {(e["mesh"], e["stage"]): e for e in json.load(f)["results"]}
+    with open(args.current) as f:
+        current = json.load(f)["results"]
+
+    regressions = 0
+    print(f"{'mesh':<18}{'stage':<26}{'base ms':>12}{'new ms':>12}{'change':>10}")
+    for entry in current:
+        base = baseline.get((entry["mesh"], entry["stage"]))
+        if base is None:
+            continue
+
+        base_ms, new_ms = base["median_ms"], entry["median_ms"]
+        change = (new_ms - base_ms) / base_ms if base_ms > 0 else 0.0
+        regressed = (change > args.threshold and
+                     new_ms - base_ms > MIN_SIGNIFICANT_MS)
+        regressions += regressed
+
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{entry['mesh']:<18}{entry['stage']:<26}{base_ms:>12.3f}"
+              f"{new_ms:>12.3f}{change:>+10.1%}{flag}")
+
+    print(f"{regressions} regression(s) above {args.threshold:.0%}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Renderer benchmark suite")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument("-o", "--output", default="bench_results.json")
+    run_parser.add_argument("--repeats", type=int, default=5)
+    run_parser.add_argument("--width", type=int, default=1024)
+    run_parser.add_argument("--height", type=int, default=768)
+    run_parser.add_argument("--max-edges", type=int, default=SYNTHETIC_EDGE_COUNTS[-1],
+                            help="skip synthetic meshes with more edges than this")
+    run_parser.add_argument("--workers", type=int, default=0,
+                            help="rasterize on this many processes, 0 for one")
+    run_parser.add_argument("--no-hud", action="store_true", help="skip the HUD stage")
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.10,
+                                help="relative slowdown flagged as a regression")
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    exit(main())
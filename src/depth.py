@@ -0,0 +1,131 @@
+import numpy as np
+
+class DepthBuffer:
+    """
+    Per-pixel nearest depth key of rasterized triangles, used to hide the
+    parts of edges that lie behind a surface. Keys only need to grow with
+    distance and be linear in screen space (z for orthographic, -1 / depth
+    for perspective projection).
+
+    The buffer has a one pixel border of +inf so neighbourhood lookups at
+    the screen edge need no bounds checks.
+    """
+
+    # Upper bound on candidate pixels evaluated per block
+    MAX_BLOCK_SAMPLES = 1 << 21
+
+    def __init__(self):
+        self.width = 0
+        self.height = 0
+        self._depth = None
+
+    def clear(self, size):
+        """Reset every pixel of a (width, height) buffer to +inf"""
+        width, height = size
+        if self._depth is None or self._depth.shape != (width + 2, height + 2):
+            self._depth = np.empty((width + 2, height + 2), dtype=np.float64)
+        self._depth.fill(np.inf)
+        self.width, self.height = width, height
+
+    def rasterize(self, points, keys, triangles, slope_tolerance: float = 0.0,
+                  relative_tolerance: float = 0.0):
+        """
+        Scan convert (T, 3) triangles over (N, 2) screen points with (N,)
+        depth keys, keeping the nearest key of every pixel whose center
+        lies inside or on a triangle. Either winding is drawn.
+
+        Each triangle is pushed back by slope_tolerance times its largest
+        key change per pixel plus relative_tolerance times its largest
+        |key|, so edges lying on it survive rounding. The offset only
+        depends on the triangle itself, not on the rest of the scene.
+        """
+        triangles = np.asarray(triangles).reshape(-1, 3)
+        if not len(triangles):
+            return
+        corners = points[triangles].astype(np.float64)
+        corner_keys = keys[triangles]
+
+        a, b, c = corners[:, 0], corners[:, 1], corners[:, 2]
+        area = (b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (c[:, 0] - a[:, 0])
+        low = np.maximum(np.ceil(corners.min(axis=1)), 0).astype(np.int64)
+        high = np.minimum(np.floor(corners.max(axis=1)), [self.width - 1, self.height - 1])
+        high = high.astype(np.int64)
+        # Degenerate and off-screen triangles cover no pixel centers
+        drawn = (area != 0) & np.all(high >= low, axis=1)
+        if not drawn.any():
+            return
+        corners, corner_keys, area = corners[drawn], corner_keys[drawn], area[drawn]
+        low, high = low[drawn], high[drawn]
+
+        # Edge functions A * x + B * y + C of the three edges, flipped for
+        # clockwise triangles so the inside is >= 0 for either winding
+        p = corners[:, [1, 2, 0]]
+        q = corners[:, [2, 0, 1]]
+        sign = np.sign(area)[:, None]
+        edge_x = (p[:, :, 1] - q[:, :, 1]) * sign
+        edge_y = (q[:, :, 0] - p[:, :, 0]) * sign
+        edge_c = (p[:, :, 0] * q[:, :, 1] - p[:, :, 1] * q[:, :, 0]) * sign
+        # Edge i is opposite corner i, so edge / |area| is that corner's
+        # barycentric weight and the key is a plane over the screen
+        plane = np.stack([edge_x, edge_y, edge_c], axis=2) * corner_keys[:, :, None]
+        plane = plane.sum(axis=1) / np.abs(area)[:, None]
+        plane[:, 2] += (slope_tolerance * np.abs(plane[:, :2]).max(axis=1) +
+                        relative_tolerance * np.abs(corner_keys).max(axis=1))
+
+        # One span per triangle row, the rows between the bounding box edges
+        heights = high[:, 1] - low[:, 1] + 1
+        triangle = np.repeat(np.arange(len(heights)), heights)
+        y = low[triangle, 1] + np.arange(len(triangle)) - np.repeat(np.cumsum(heights) - heights, heights)
+        left = low[triangle, 0].astype(np.float64)
+        right = high[triangle, 0].astype(np.float64)
+        for i in range(3):
+            a = edge_x[triangle, i]
+            offset = edge_y[triangle, i] * y + edge_c[triangle, i]
+            # a * x + offset >= 0 bounds x from below or above depending on a
+            bound = np.divide(-offset, a, out=np.zeros_like(offset), where=a != 0)
+            left = np.where(a > 0, np.maximum(left, np.ceil(bound)), left)
+            right = np.where(a < 0, np.minimum(right, np.floor(bound)), right)
+            right = np.where((a == 0) & (offset < 0), left - 1, right)
+
+        counts = np.maximum(right - left + 1, 0).astype(np.int64)
+        filled = counts > 0
+        triangle, y, left, counts = triangle[filled], y[filled], left[filled], counts[filled]
+        cumulative = np.cumsum(counts)
+        row_start = 0
+        while row_start < len(counts):
+            # Rows whose pixels fit in one block (always at least one row)
+            budget = (cumulative[row_start - 1] if row_start else 0) + self.MAX_BLOCK_SAMPLES
+            row_end = max(row_start + 1, int(np.searchsorted(cumulative, budget, side="right")))
+            rows = slice(row_start, row_end)
+            row_start = row_end
+            self._fill_spans(plane[triangle[rows]], y[rows], left[rows].astype(np.int64),
+                             counts[rows])
+
+    def _fill_spans(self, plane, y, left, counts):
+        """Keep the nearest plane key over the pixels of each (y, left, count) span"""
+        row = np.repeat(np.arange(len(counts)), counts)
+        x = left[row] + np.arange(len(row)) - np.repeat(np.cumsum(counts) - counts, counts)
+        depth = plane[row, 0] * x + (plane[:, 1] * y + plane[:, 2])[row]
+        index = (x + 1) * (self.height + 2) + y[row] + 1
+        np.minimum.at(self._depth.reshape(-1), index, depth)
+
+    def visible(self, xs, ys, keys, tolerance: float = 0.0):
+        """
+        Mask of on-screen pixels whose key is not behind the surface around
+        them. Comparing against the farthest key of the 3x3 neighbourhood
+        keeps edges lying on a surface from being hidden by rounding or by
+        the slope of the faces they bound.
+        """
+        farthest = np.full(len(xs), -np.inf)
+        for dx in range(3):
+            for dy in range(3):
+                np.maximum(farthest, self._depth[xs + dx, ys + dy], out=farthest)
+        return keys <= farthest + tolerance
+
+    def points_visible(self, points, keys, tolerance: float = 0.0):
+        """visible() for (N, 2) points, points off the screen count as visible"""
+        xs, ys = points[:, 0], points[:, 1]
+        on_screen = (xs >= 0) & (xs < self.width) & (ys >= 0) & (ys < self.height)
+        shown = np.ones(len(points), dtype=bool)
+        shown[on_screen] = self.visible(xs[on_screen], ys[on_screen], keys[on_screen], tolerance)
+        return shown
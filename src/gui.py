@@ -1,10 +1,27 @@
 import pygame
 import sys
+import time
+import numpy as np
 from objects import create_object
+from math_utils import quaternions_from_euler, quaternion_slerp
 from transformations import Transform, TransformManager
 from renderer import Renderer3D
+from profiler import FrameProfiler
+from hud import HUDLayer
+from pipeline import RenderThread
+from capture import FrameRecorder
 
 class GUI:
+    # Simulation steps per second, rotation and movement speeds are per step
+    SIMULATION_RATE = 60
+    # Presented frames per second at most
+    MAX_FPS = 120
+    # Longest real time one frame may feed into the simulation, in seconds
+    MAX_FRAME_TIME = 0.25
+    # Renderer options copied to the render thread with each frame
+    FRAME_SETTINGS = ("current_projection", "line_width", "show_vertices", "antialiasing",
+                      "hidden_line_removal", "backface_culling")
+
     def __init__(self, width: int = 1024, height: int = 768):
         pygame.init()
 
@@ -19,13 +36,26 @@ class GUI:
         self.running = True
 
         # Initialize components
+        # Holds the options the user picked, frame_renderer draws with a
+        # per-frame copy of them on the render thread
         self.renderer = Renderer3D(width, height)
+        self.frame_renderer = Renderer3D(width, height)
+        self.frame_transforms = TransformManager()
+        self.offscreen = self.screen.copy()
+        # Shared with the renderer so its stages land in the same overlay
+        self.profiler = FrameProfiler()
+        self.frame_renderer.profiler = self.profiler
+        self.trace_path = "frame_trace.json"
+        # Session recording, frames are encoded on background threads
+        self.capture_path = "capture.y4m"
+        self.recorder = None
         self.transform_manager = TransformManager()
         self.current_object = create_object("cube", size=2.0)
 
         # Create transform for the object
         self.object_transform = Transform()
         self.transform_manager.add_transform(self.object_transform)
+        self.previous_state = self.capture_state()
 
         # Control variables
         self.rotation_speed = 1.0
@@ -36,12 +66,23 @@ class GUI:
         pygame.font.init()
         self.font = pygame.font.Font(None, 24)
         self.small_font = pygame.font.Font(None, 18)
+        self.mono_font = pygame.font.SysFont("monospace", 14)
+
+        # Retained HUD and dirty-rect presentation state
+        self.setup_hud()
+        self.profiler_rows = 0
+        self.last_drawn_rect = None
+        self.full_redraw = True
 
     def handle_events(self):
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 self.running = False
 
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                # The window contents were lost, present everything again
+                self.full_redraw = True
+
             elif event.type == pygame.KEYDOWN:
                 self.keys_pressed.add(event.key)
                 self.handle_key_press(event.key)
@@ -65,17 +106,40 @@ class GUI:
             self.current_object = create_object("tetrahedron", size=1.5)
         elif key == pygame.K_4:
             self.current_object = create_object("octahedron", size=1.5)
+        elif key == pygame.K_5:
+            self.current_object = create_object("sphere", radius=1.5)
+        elif key == pygame.K_6:
+            self.current_object = create_object("torus", major_radius=1.3, minor_radius=0.5)
+        elif key == pygame.K_7:
+            self.current_object = create_object("grid", size=3.0, divisions=12)
+        elif key == pygame.K_8:
+            self.current_object = create_object("cylinder", radius=1.0, height=2.5)
+        elif key == pygame.K_9:
+            self.current_object = create_object("icosphere", radius=1.5, level=2)
 
         # Toggle features
         elif key == pygame.K_v:
             self.renderer.toggle_vertices()
+        elif key == pygame.K_l:
+            self.renderer.toggle_antialiasing()
+        elif key == pygame.K_h:
+            self.renderer.toggle_hidden_line_removal()
+        elif key == pygame.K_b:
+            self.renderer.toggle_backface_culling()
         elif key == pygame.K_SPACE:
             self.auto_rotate = not self.auto_rotate
+        elif key == pygame.K_F3:
+            self.profiler.toggle()
+        elif key == pygame.K_F4:
+            self.toggle_trace()
+        elif key == pygame.K_F5:
+            self.toggle_recording()
         elif key == pygame.K_r:
             # Reset transformations
             self.object_transform = Transform()
             self.transform_manager.clear_transforms()
             self.transform_manager.add_transform(self.object_transform)
+            self.previous_state = self.capture_state()
 
         # Line width adjustment
         elif key == pygame.K_PLUS or key == pygame.K_EQUALS:
@@ -83,6 +147,26 @@ class GUI:
         elif key == pygame.K_MINUS:
             self.renderer.set_line_width(self.renderer.line_width - 1)
 
+    def toggle_trace(self):
+        """Start recording a Chrome trace, or stop and write it to trace_path"""
+        if not self.profiler.tracing:
+            self.profiler.start_trace()
+            return
+        self.profiler.stop_trace()
+        count = self.profiler.export_chrome_trace(self.trace_path)
+        print(f"Wrote {count} trace events to {self.trace_path}")
+
+    def toggle_recording(self):
+        """Start recording presented frames to capture_path, or stop and report"""
+        if self.recorder is None:
+            self.recorder = FrameRecorder(self.capture_path, (self.width, self.height),
+                                          fps=self.SIMULATION_RATE)
+            return
+        stats = self.recorder.close()
+        self.recorder = None
+        print(f"Recorded {stats['written']} frames to {self.capture_path}, "
+              f"{stats['dropped']} dropped")
+
     def handle_continuous_input(self):
         """Handle keys that should be processed continuously"""
         # Manual rotation controls
@@ -148,7 +232,9 @@ class GUI:
             )
 
     def update(self):
-        """Update the application state"""
+        """Advance the simulation by one fixed time step"""
+        self.previous_state = self.capture_state()
+
         # Auto rotation
         if self.auto_rotate:
             current_rot = self.object_transform.rotation
@@ -161,56 +247,207 @@ class GUI:
         # Handle continuous input
         self.handle_continuous_input()
 
-    def draw_ui(self):
-        # Current projection
-        projection_text = f"Projection: {self.renderer.current_projection}"
-        text_surface = self.font.render(projection_text, True, (255, 255, 255))
-        self.screen.blit(text_surface, (10, 10))
+    def capture_state(self):
+        """Snapshot of the object transform to interpolate from"""
+        t = self.object_transform
+        return (
+            (t.translation.x, t.translation.y, t.translation.z),
+            (t.rotation.x, t.rotation.y, t.rotation.z),
+            (t.scale.x, t.scale.y, t.scale.z),
+        )
 
-        # Current object
-        object_text = f"Object: {self.current_object.name}"
-        text_surface = self.font.render(object_text, True, (255, 255, 255))
-        self.screen.blit(text_surface, (10, 35))
+    def interpolated_transform(self, alpha: float) -> Transform:
+        """
+        New Transform between the state before and after the last step,
+        alpha = 0 being the previous state. Rotation is slerped.
+        """
+        (t0, r0, s0), (t1, r1, s1) = self.previous_state, self.capture_state()
+        transform = Transform()
+        transform.set_translation(*(a + (b - a) * alpha for a, b in zip(t0, t1)))
+        transform.set_scale(*(a + (b - a) * alpha for a, b in zip(s0, s1)))
+        if alpha >= 1 or r0 == r1:
+            transform.set_rotation(*r1)
+        else:
+            start, end = quaternions_from_euler(np.array([r0, r1]))
+            transform.set_quaternion(*quaternion_slerp(start, end, alpha)[0])
+        return transform
+
+    def setup_hud(self):
+        """Create the HUD text elements, the help lines never change after this"""
+        self.hud = HUDLayer(self.renderer.background_color)
+        self.hud.add("projection", self.font, (255, 255, 255), (10, 10))
+        self.hud.add("object", self.font, (255, 255, 255), (10, 35))
+        self.hud.add("recording", self.font, (255, 80, 80), (10, 60))
 
         # Controls
         help_texts = [
             "Controls:",
             "O - Orthographic projection",
             "P - Perspective projection",
-            "1-4 - Switch objects",
+            "1-9 - Switch objects",
             "Arrow Keys - Manual rotation",
             "WASD - Move object",
             "Z/X - Scale object",
             "V - Toggle vertices",
+            "L - Toggle anti-aliasing",
+            "H - Toggle hidden lines",
+            "B - Toggle back-face culling",
             "Space - Toggle auto-rotation",
             "R - Reset transform",
             "+/- - Line width",
+            "F3 - Profiler overlay",
+            "F4 - Start/stop trace",
+            "F5 - Start/stop recording",
         ]
 
         y_offset = self.height - len(help_texts) * 20 - 10
         for i, text in enumerate(help_texts):
             color = (255, 255, 255) if i == 0 else (200, 200, 200)
-            text_surface = self.small_font.render(text, True, color)
-            self.screen.blit(text_surface, (10, y_offset + i * 18))
+            self.hud.add(f"help{i}", self.small_font, color, (10, y_offset + i * 18), text=text)
 
-    def render(self):
-        """Render the current frame"""
-        self.renderer.clear_screen(self.screen)
+    def hud_values(self):
+        """Text of every changing HUD element, read on the main thread"""
+        values = {
+            "projection": f"Projection: {self.renderer.current_projection}",
+            "object": f"Object: {self.current_object.name}",
+            "recording": "",
+        }
+        if self.recorder is not None:
+            values["recording"] = (f"REC {self.recorder.frames_captured} frames, "
+                                   f"{self.recorder.frames_dropped} dropped")
 
-        self.renderer.render_object(
-            self.screen, self.current_object, self.transform_manager
-        )
+        lines = self.profiler.overlay_lines() if self.profiler.enabled else []
+        for i in range(max(len(lines), self.profiler_rows)):
+            values[f"profiler{i}"] = lines[i] if i < len(lines) else ""
+        self.profiler_rows = max(len(lines), self.profiler_rows)
+        return values
+
+    def update_ui(self, values):
+        """Push values into the HUD, elements only re-render on change"""
+        line_height = self.mono_font.get_linesize()
+        for name, text in values.items():
+            if name not in self.hud.elements:
+                # Profiler rows are created as stages show up
+                row = int(name[len("profiler"):])
+                self.hud.add(name, self.mono_font, (255, 255, 0),
+                             (self.width - 10, 10 + row * line_height), anchor="topright")
+            self.hud.set(name, text)
+
+    def draw_ui(self, damaged=None, values=None):
+        """Blit the HUD over the damaged regions (whole buffer by default), returns changed rects"""
+        self.update_ui(self.hud_values() if values is None else values)
+        if damaged is None:
+            damaged = [self.offscreen.get_rect()]
+        return self.hud.draw(self.offscreen, damaged)
+
+    def prepare_frame(self, alpha: float = 1.0):
+        """
+        Everything render_frame needs, captured on the main thread so the
+        render thread never reads state that events or updates change
+        """
+        frame = {
+            "object": self.current_object,
+            "transform": self.interpolated_transform(alpha),
+            "settings": {name: getattr(self.renderer, name) for name in self.FRAME_SETTINGS},
+            "hud": self.hud_values(),
+            "full_redraw": self.full_redraw,
+        }
+        self.full_redraw = False
+        return frame
 
-        self.draw_ui()
-        pygame.display.flip()
+    def render_frame(self, frame):
+        """
+        Draw a prepared frame into the offscreen buffer. Returns the rects
+        that changed, or None when the whole buffer has to be presented.
+        """
+        renderer = self.frame_renderer
+        for name, value in frame["settings"].items():
+            setattr(renderer, name, value)
+        self.frame_transforms.clear_transforms()
+        self.frame_transforms.add_transform(frame["transform"])
+        self.update_ui(frame["hud"])
+
+        if frame["full_redraw"]:
+            renderer.clear_screen(self.offscreen)
+            damaged = [self.offscreen.get_rect()]
+        else:
+            # Erase last frame's wireframe and any HUD text about to change
+            damaged = self.hud.erase_rects()
+            if self.last_drawn_rect is not None:
+                damaged.append(self.last_drawn_rect)
+            renderer.clear_screen(self.offscreen, damaged)
+
+        renderer.render_object(self.offscreen, frame["object"], self.frame_transforms)
+        drawn_rect = renderer.take_drawn_rect()
+        if drawn_rect is not None:
+            damaged.append(drawn_rect)
+
+        with self.profiler.stage("ui"):
+            damaged += self.hud.draw(self.offscreen, damaged)
+
+        self.last_drawn_rect = drawn_rect
+        return None if frame["full_redraw"] else damaged
+
+    def present(self, rects):
+        """Copy the changed rects (None for all) of the offscreen buffer to the display"""
+        with self.profiler.stage("flip"):
+            if rects is None:
+                self.screen.blit(self.offscreen, (0, 0))
+                pygame.display.flip()
+            else:
+                for rect in rects:
+                    self.screen.blit(self.offscreen, rect, rect)
+                pygame.display.update(rects)
+
+        # Only a copy into a pooled buffer here, encoding happens elsewhere
+        if self.recorder is not None:
+            with self.profiler.stage("capture"):
+                self.recorder.capture(self.screen, time.perf_counter())
+
+    def render(self):
+        """Render and present the current state, without the render thread"""
+        self.present(self.render_frame(self.prepare_frame()))
 
     def run(self):
-        """Main application loop (runs at 60FPS)"""
-        while self.running:
-            self.handle_events()
-            self.update()
-            self.render()
-            self.clock.tick(60)
+        """
+        Main application loop. The simulation advances in fixed steps of
+        SIMULATION_RATE per second, independent of the frame rate, and
+        frames show the state interpolated between the last two steps.
+        Frame N is drawn on the render thread while the main thread
+        handles input and steps the simulation for frame N+1.
+        """
+        render_thread = RenderThread()
+        time_step = 1.0 / self.SIMULATION_RATE
+        accumulator = 0.0
+        previous_time = time.perf_counter()
+
+        try:
+            while self.running:
+                with self.profiler.stage("frame"):
+                    now = time.perf_counter()
+                    # After a long stall, drop time rather than spiral into catch-up steps
+                    accumulator += min(now - previous_time, self.MAX_FRAME_TIME)
+                    previous_time = now
+
+                    with self.profiler.stage("events"):
+                        self.handle_events()
+                    with self.profiler.stage("update"):
+                        while accumulator >= time_step:
+                            self.update()
+                            accumulator -= time_step
+                    frame = self.prepare_frame(accumulator / time_step)
+
+                    if render_thread.pending:
+                        self.present(render_thread.wait())
+                    render_thread.submit(self.render_frame, frame)
+                self.clock.tick(self.MAX_FPS)
+
+            if render_thread.pending:
+                self.present(render_thread.wait())
+        finally:
+            render_thread.close()
+            if self.recorder is not None:
+                self.toggle_recording()
 
         pygame.quit()
         sys.exit()
@@ -0,0 +1,55 @@
+import pygame
+import numpy as np
+from objects import Object3D
+from transformations import TransformManager
+from renderer import Renderer3D
+from scene import SceneNode
+from typing import Iterable, Union
+
+class OffscreenRenderer:
+    """Drives Renderer3D into an in-memory surface, no window or display needed"""
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.renderer = Renderer3D(width, height)
+        # Plain surfaces don't need pygame.display, so this works on servers
+        self.surface = pygame.Surface((width, height))
+
+    def render(self, scene: Union[Object3D, Iterable[Object3D], SceneNode],
+               transform_manager: TransformManager = None,
+               projection: str = "orthographic") -> pygame.Surface:
+        """
+        Render one frame of the scene and return the offscreen surface.
+        Scene graphs use their own node transforms, plain objects use
+        transform_manager, or no transform when it is None.
+        """
+        if transform_manager is None:
+            transform_manager = TransformManager()
+        self.renderer.set_projection(projection)
+        self.renderer.clear_screen(self.surface)
+
+        if isinstance(scene, SceneNode):
+            self.renderer.render_scene(self.surface, scene)
+            return self.surface
+
+        objects = [scene] if isinstance(scene, Object3D) else scene
+        for obj in objects:
+            self.renderer.render_object(self.surface, obj, transform_manager)
+
+        return self.surface
+
+    def render_array(self, scene: Union[Object3D, Iterable[Object3D], SceneNode],
+                     transform_manager: TransformManager = None,
+                     projection: str = "orthographic",
+                     out: np.ndarray = None) -> np.ndarray:
+        """Render one frame and return it as a (height, width, 3) uint8 RGB array"""
+        surface = self.render(scene, transform_manager, projection)
+        if out is None:
+            out = np.empty((self.height, self.width, 3), dtype=np.uint8)
+
+        # surfarray is indexed (x, y), so transpose into row-major image order
+        pixels = pygame.surfarray.pixels3d(surface)
+        out[:] = pixels.transpose(1, 0, 2)
+        del pixels
+        return out
@@ -0,0 +1,87 @@
+import pygame
+from typing import Dict, List
+
+class TextElement:
+    """
+    One line of HUD text. The text is rendered to a surface once and only
+    re-rendered when set_text() is given a different value.
+
+    Glyph edges are blended against the background color and the rest is
+    color keyed out, so blitting the text again over itself is idempotent
+    and it can be redrawn over any damaged region without clearing it first.
+    """
+
+    def __init__(self, font, color, position, anchor: str = "topleft",
+                 background=(0, 0, 0)):
+        self.font = font
+        self.color = color
+        self.background = background
+        self.position = position
+        self.anchor = anchor
+        self.text = None
+        self.surface = None
+        # Where the current text goes and where it was last drawn
+        self.rect = None
+        self.drawn_rect = None
+        self.dirty = False
+
+    def set_text(self, text: str):
+        if text == self.text:
+            return
+        self.text = text
+        if text:
+            self.surface = self.font.render(text, True, self.color, self.background)
+            self.surface.set_colorkey(self.background)
+            self.rect = self.surface.get_rect(**{self.anchor: self.position})
+        else:
+            self.surface = None
+            self.rect = None
+        self.dirty = True
+
+
+class HUDLayer:
+    """
+    Retained set of named text elements. draw() only blits elements that
+    changed or that overlap areas repainted this frame, and reports which
+    screen regions it touched so the caller can present just those.
+    """
+
+    def __init__(self, background=(0, 0, 0)):
+        self.background = background
+        self.elements: Dict[str, TextElement] = {}
+
+    def add(self, name: str, font, color, position, anchor: str = "topleft",
+            text: str = "") -> TextElement:
+        element = TextElement(font, color, position, anchor, self.background)
+        element.set_text(text)
+        self.elements[name] = element
+        return element
+
+    def set(self, name: str, text: str):
+        self.elements[name].set_text(text)
+
+    def erase_rects(self) -> List[pygame.Rect]:
+        """Regions of changed elements' old text, to be cleared before drawing"""
+        return [element.drawn_rect for element in self.elements.values()
+                if element.dirty and element.drawn_rect is not None]
+
+    def draw(self, surface, damaged: List[pygame.Rect]) -> List[pygame.Rect]:
+        """
+        Blit changed elements and those overlapping the damaged regions.
+        Returns the rects of changed elements, old and new, to present.
+        """
+        changed = []
+        for element in self.elements.values():
+            if element.dirty:
+                if element.drawn_rect is not None:
+                    changed.append(element.drawn_rect)
+                if element.rect is not None:
+                    changed.append(element.rect)
+            elif element.rect is None or element.rect.collidelist(damaged) < 0:
+                continue
+
+            if element.surface is not None:
+                surface.blit(element.surface, element.rect)
+            element.drawn_rect = element.rect
+            element.dirty = False
+        return changed
@@ -0,0 +1,402 @@
+"""
+Wavefront OBJ and PLY mesh import.
+
+Text is parsed in fixed-size chunks so only one chunk of lines is held in
+memory next to the compact arrays built so far. The first load of a file
+writes a binary sidecar (<file>.geomcache) that later loads map straight
+into memory with np.memmap instead of parsing the text again.
+"""
+from objects import Object3D
+from itertools import islice
+from typing import List, Tuple
+import numpy as np
+import os
+import struct
+
+# Lines (text formats) or records (binary PLY) parsed per chunk
+CHUNK_SIZE = 1 << 16
+
+CACHE_SUFFIX = ".geomcache"
+CACHE_MAGIC = b"CGGEOM01"
+# magic, source size, source mtime (ns), vertex, edge, face and face index counts
+CACHE_HEADER = struct.Struct("<8sqqqqqq")
+CACHE_HEADER_SIZE = 64
+
+PLY_TYPES = {
+    "char": "i1", "int8": "i1", "uchar": "u1", "uint8": "u1",
+    "short": "i2", "int16": "i2", "ushort": "u2", "uint16": "u2",
+    "int": "i4", "int32": "i4", "uint": "u4", "uint32": "u4",
+    "float": "f4", "float32": "f4", "double": "f8", "float64": "f8",
+}
+
+# Parsed geometry: (N, 3) vertices, (E, 2) edges, face offsets (F + 1) and
+# flat face vertex indices, the faces in CSR layout
+MeshArrays = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+
+def load_mesh(path: str, use_cache: bool = True) -> Object3D:
+    """Load an OBJ or PLY file as an array-backed Object3D"""
+    name = os.path.splitext(os.path.basename(path))[0]
+    cache_path = path + CACHE_SUFFIX
+
+    if use_cache:
+        cached = read_geometry_cache(cache_path, os.stat(path))
+        if cached is not None:
+            vertices, edges, face_offsets, face_indices = cached
+            obj = Object3D.from_arrays(name, vertices, edges, validate=False)
+            obj.set_faces(face_offsets, face_indices)
+            return obj
+
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".obj":
+        vertices, edges, face_offsets, face_indices = load_obj(path)
+    elif extension == ".ply":
+        vertices, edges, face_offsets, face_indices = load_ply(path)
+    else:
+        raise ValueError(f"Unsupported mesh format: {extension}")
+
+    # Checked before caching, cached loads skip validation
+    if len(face_indices) and (face_indices.min() < 0 or face_indices.max() >= len(vertices)):
+        raise ValueError("face indices out of range")
+
+    homogeneous = np.ones((len(vertices), 4), dtype=np.float64)
+    homogeneous[:, :3] = vertices
+    del vertices
+
+    if use_cache:
+        write_geometry_cache(cache_path, os.stat(path),
+                             homogeneous, edges, face_offsets, face_indices)
+
+    obj = Object3D.from_arrays(name, homogeneous, edges)
+    obj.set_faces(face_offsets, face_indices)
+    return obj
+
+
+def load_obj(path: str) -> MeshArrays:
+    """Parse a Wavefront OBJ file chunk by chunk"""
+    vertex_chunks: List[np.ndarray] = []
+    face_index_chunks: List[np.ndarray] = []
+    face_size_chunks: List[np.ndarray] = []
+    line_edge_chunks: List[np.ndarray] = []
+    vertex_count = 0
+
+    with open(path, "r") as f:
+        while True:
+            lines = list(islice(f, CHUNK_SIZE))
+            if not lines:
+                break
+
+            vertex_tokens = []
+            face_tokens, face_sizes, face_bases, line_edges = [], [], [], []
+            for line in lines:
+                if line.startswith("v "):
+                    vertex_tokens.append(line.split()[1:4])
+                    vertex_count += 1
+                elif line.startswith("f "):
+                    # Only the vertex index of "v/vt/vn" references is kept
+                    tokens = line.split()[1:]
+                    if "/" in line:
+                        tokens = [token.split("/", 1)[0] for token in tokens]
+                    face_tokens.extend(tokens)
+                    face_sizes.append(len(tokens))
+                    face_bases.append(vertex_count)
+                elif line.startswith("l "):
+                    indices = [int(_obj_index(int(token.split("/", 1)[0]), vertex_count))
+                               for token in line.split()[1:]]
+                    line_edges.extend(zip(indices[:-1], indices[1:]))
+
+            if vertex_tokens:
+                vertex_chunks.append(np.array(vertex_tokens, dtype=np.float64))
+            if face_sizes:
+                sizes = np.array(face_sizes, dtype=np.int64)
+                bases = np.repeat(np.array(face_bases, dtype=np.int64), sizes)
+                face_index_chunks.append(
+                    _obj_index(np.array(face_tokens, dtype=np.int64), bases).astype(np.int32)
+                )
+                face_size_chunks.append(sizes)
+            if line_edges:
+                line_edge_chunks.append(np.array(line_edges, dtype=np.int32))
+
+    vertices = _concatenate(vertex_chunks, (0, 3), np.float64)
+    face_indices = _concatenate(face_index_chunks, (0,), np.int32)
+    face_offsets = _sizes_to_offsets(_concatenate(face_size_chunks, (0,), np.int64))
+    extra_edges = _concatenate(line_edge_chunks, (0, 2), np.int32)
+
+    edges = _face_edges(face_offsets, face_indices, extra_edges, len(vertices))
+    return vertices, edges, face_offsets, face_indices
+
+
+def _obj_index(index, vertex_count):
+    """
+    Convert OBJ indices to 0-based. Positive indices are 1-based, negative
+    ones count back from the last vertex defined so far (vertex_count).
+    """
+    return np.where(index > 0, index - 1, vertex_count + index)
+
+
+def load_ply(path: str) -> MeshArrays:
+    """Parse an ASCII or binary PLY file chunk by chunk"""
+    with open(path, "rb") as f:
+        file_format, elements = _read_ply_header(f)
+
+        vertices = np.empty((0, 3), dtype=np.float64)
+        face_offsets = np.zeros(1, dtype=np.int64)
+        face_indices = np.empty(0, dtype=np.int32)
+        extra_edges = np.empty((0, 2), dtype=np.int32)
+
+        for element, count, properties in elements:
+            if file_format == "ascii":
+                data = _read_ply_ascii_element(f, count, properties)
+            else:
+                byte_order = "<" if file_format == "binary_little_endian" else ">"
+                data = _read_ply_binary_element(f, count, properties, byte_order)
+
+            if element == "vertex":
+                vertices = np.stack([data["x"], data["y"], data["z"]], axis=1).astype(np.float64)
+            elif element == "face":
+                face_offsets, face_indices = data["__list__"]
+            elif element == "edge":
+                extra_edges = np.stack([data["vertex1"], data["vertex2"]], axis=1).astype(np.int32)
+
+    edges = _face_edges(face_offsets, face_indices, extra_edges, len(vertices))
+    return vertices, edges, face_offsets, face_indices
+
+
+def _read_ply_header(f):
+    if f.readline().strip() != b"ply":
+        raise ValueError("Not a PLY file")
+
+    file_format = None
+    elements = []  # (name, count, [(property name, dtype or (count dtype, index dtype))])
+    while True:
+        line = f.readline()
+        if not line:
+            raise ValueError("PLY header is missing end_header")
+        tokens = line.decode("ascii").split()
+        if not tokens or tokens[0] in ("comment", "obj_info"):
+            continue
+
+        if tokens[0] == "format":
+            file_format = tokens[1]
+        elif tokens[0] == "element":
+            elements.append((tokens[1], int(tokens[2]), []))
+        elif tokens[0] == "property":
+            if tokens[1] == "list":
+                elements[-1][2].append((tokens[4], (PLY_TYPES[tokens[2]], PLY_TYPES[tokens[3]])))
+            else:
+                elements[-1][2].append((tokens[2], PLY_TYPES[tokens[1]]))
+        elif tokens[0] == "end_header":
+            break
+
+    if file_format not in ("ascii", "binary_little_endian", "binary_big_endian"):
+        raise ValueError(f"Unsupported PLY format: {file_format}")
+    return file_format, elements
+
+
+def _list_property(properties):
+    """Index of the single list property of an element, or None if it has none"""
+    lists = [i for i, (_, kind) in enumerate(properties) if isinstance(kind, tuple)]
+    if len(lists) > 1:
+        raise ValueError("PLY elements with more than one list property are not supported")
+    return lists[0] if lists else None
+
+
+def _read_ply_ascii_element(f, count, properties):
+    list_position = _list_property(properties)
+    scalar_names = [name for name, kind in properties if not isinstance(kind, tuple)]
+    columns = {name: [] for name in scalar_names}
+    size_chunks, index_chunks = [], []
+
+    remaining = count
+    while remaining > 0:
+        lines = list(islice(f, min(CHUNK_SIZE, remaining)))
+        if not lines:
+            raise ValueError("PLY file ended early")
+        remaining -= len(lines)
+
+        if list_position is None:
+            # Fixed number of scalar columns, parse the whole chunk at once
+            values = np.array(b" ".join(lines).split(), dtype=np.float64)
+            values = values.reshape(len(lines), len(properties))
+            for i, name in enumerate(scalar_names):
+                columns[name].append(values[:, i])
+            continue
+
+        scalars, sizes, indices = [], [], []
+        for line in lines:
+            tokens = line.split()
+            size = int(tokens[list_position])
+            sizes.append(size)
+            indices.extend(tokens[list_position + 1:list_position + 1 + size])
+            scalars.append(tokens[:list_position] + tokens[list_position + 1 + size:])
+
+        values = np.array(scalars, dtype=np.float64).reshape(len(lines), len(scalar_names))
+        for i, name in enumerate(scalar_names):
+            columns[name].append(values[:, i])
+        size_chunks.append(np.array(sizes, dtype=np.int64))
+        index_chunks.append(np.array(indices, dtype=np.int64).astype(np.int32))
+
+    data = {name: _concatenate(chunks, (0,), np.float64) for name, chunks in columns.items()}
+    if list_position is not None:
+        data["__list__"] = (_sizes_to_offsets(_concatenate(size_chunks, (0,), np.int64)),
+                            _concatenate(index_chunks, (0,), np.int32))
+    return data
+
+
+def _read_ply_binary_element(f, count, properties, byte_order):
+    list_position = _list_property(properties)
+    if list_position is None:
+        record = np.dtype([(name, byte_order + kind) for name, kind in properties])
+        chunks = []
+        remaining = count
+        while remaining > 0:
+            batch = min(CHUNK_SIZE, remaining)
+            chunk = np.frombuffer(f.read(batch * record.itemsize), dtype=record)
+            if len(chunk) != batch:
+                raise ValueError("PLY file ended early")
+            chunks.append(chunk.copy())
+            remaining -= batch
+        records = np.concatenate(chunks) if chunks else np.empty(0, dtype=record)
+        return {name: records[name] for name, _ in properties}
+
+    if len(properties) != 1:
+        raise ValueError("Binary PLY list elements with extra properties are not supported")
+    size_type, index_type = properties[0][1]
+    return {"__list__": _read_ply_binary_lists(f, count, byte_order + size_type,
+                                               byte_order + index_type)}
+
+
+def _read_ply_binary_lists(f, count, size_type, index_type):
+    """Read count binary (size, index * size) lists as CSR offsets and indices"""
+    size_type, index_type = np.dtype(size_type), np.dtype(index_type)
+    offsets_chunks, index_chunks = [np.zeros(1, dtype=np.int64)], []
+    total = 0
+    remaining = count
+
+    while remaining > 0:
+        # Meshes are usually all triangles or all quads, so guess that every
+        # list in the chunk has the size of the first one and verify it
+        batch = min(CHUNK_SIZE, remaining)
+        start = f.tell()
+        size = int(np.frombuffer(f.read(size_type.itemsize), dtype=size_type)[0])
+        f.seek(start)
+
+        record = np.dtype([("size", size_type), ("indices", index_type, (size,))])
+        raw = f.read(batch * record.itemsize)
+        records = np.frombuffer(raw, dtype=record, count=len(raw) // record.itemsize)
+        uniform = len(records) == batch and bool(np.all(records["size"] == size))
+
+        if uniform:
+            index_chunks.append(records["indices"].reshape(-1).astype(np.int32))
+            sizes = np.full(batch, size, dtype=np.int64)
+        else:
+            # Mixed polygon sizes, walk the lists one by one
+            f.seek(start)
+            sizes = np.empty(batch, dtype=np.int64)
+            indices = []
+            for i in range(batch):
+                sizes[i] = np.frombuffer(f.read(size_type.itemsize), dtype=size_type)[0]
+                indices.append(np.frombuffer(f.read(int(sizes[i]) * index_type.itemsize),
+                                             dtype=index_type))
+            index_chunks.append(np.concatenate(indices).astype(np.int32))
+
+        offsets_chunks.append(total + np.cumsum(sizes))
+        total += int(sizes.sum())
+        remaining -= batch
+
+    indices = np.concatenate(index_chunks) if index_chunks else np.empty(0, dtype=np.int32)
+    return np.concatenate(offsets_chunks), indices
+
+
+def _concatenate(chunks, empty_shape, dtype) -> np.ndarray:
+    if not chunks:
+        return np.empty(empty_shape, dtype=dtype)
+    return np.concatenate(chunks)
+
+
+def _sizes_to_offsets(sizes: np.ndarray) -> np.ndarray:
+    offsets = np.zeros(len(sizes) + 1, dtype=np.int64)
+    np.cumsum(sizes, out=offsets[1:])
+    return offsets
+
+
+def _face_edges(face_offsets, face_indices, extra_edges, vertex_count) -> np.ndarray:
+    """Unique undirected edges of all face outlines plus any explicit edges"""
+    # Each face index connects to the next one, wrapping around at face ends
+    following = np.arange(1, len(face_indices) + 1)
+    face_sizes = np.diff(face_offsets)
+    closed = face_sizes > 0
+    following[face_offsets[1:][closed] - 1] = face_offsets[:-1][closed]
+    edges = np.concatenate([
+        np.stack([face_indices, face_indices[following]], axis=1).astype(np.int32)
+        if len(face_indices) else np.empty((0, 2), dtype=np.int32),
+        extra_edges,
+    ])
+
+    edges = edges[(edges >= 0).all(axis=1) & (edges < vertex_count).all(axis=1)]
+    edges = np.sort(edges, axis=1)
+    edges = edges[edges[:, 0] != edges[:, 1]]
+
+    # Deduplicate via a single int64 key per edge
+    keys = edges[:, 0].astype(np.int64) * vertex_count + edges[:, 1]
+    keys.sort()
+    keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+    return np.stack([keys // vertex_count, keys % vertex_count], axis=1).astype(np.int32)
+
+
+def write_geometry_cache(cache_path, source_stat, vertices, edges, face_offsets, face_indices):
+    """Write the binary sidecar, best effort: an unwritable location just skips caching"""
+    header = CACHE_HEADER.pack(
+        CACHE_MAGIC, source_stat.st_size, source_stat.st_mtime_ns,
+        len(vertices), len(edges), len(face_offsets) - 1, len(face_indices),
+    )
+    temporary_path = cache_path + ".tmp"
+    try:
+        with open(temporary_path, "wb") as f:
+            f.write(header.ljust(CACHE_HEADER_SIZE, b"\0"))
+            for array, dtype in _cache_layout(vertices, edges, face_offsets, face_indices):
+                np.ascontiguousarray(array, dtype=dtype).tofile(f)
+                # Keep every array 8-byte aligned for the memmap views
+                f.write(b"\0" * (-f.tell() % 8))
+        os.replace(temporary_path, cache_path)
+    except OSError:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+
+
+def read_geometry_cache(cache_path, source_stat):
+    """Memory-map a sidecar written for this exact source file, or return None"""
+    try:
+        with open(cache_path, "rb") as f:
+            header = f.read(CACHE_HEADER.size)
+    except OSError:
+        return None
+    if len(header) != CACHE_HEADER.size:
+        return None
+
+    magic, size, mtime_ns, vertex_count, edge_count, face_count, index_count = \
+        CACHE_HEADER.unpack(header)
+    if magic != CACHE_MAGIC or size != source_stat.st_size or mtime_ns != source_stat.st_mtime_ns:
+        return None
+
+    shapes = [(vertex_count, 4), (edge_count, 2), (face_count + 1,), (index_count,)]
+    arrays = []
+    offset = CACHE_HEADER_SIZE
+    for shape, (_, dtype) in zip(shapes, _cache_layout(None, None, None, None)):
+        nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        if nbytes:
+            arrays.append(np.memmap(cache_path, dtype=dtype, mode="r", offset=offset, shape=shape))
+        else:
+            arrays.append(np.empty(shape, dtype=dtype))
+        offset += nbytes + (-nbytes % 8)
+    return tuple(arrays)
+
+
+def _cache_layout(vertices, edges, face_offsets, face_indices):
+    """Arrays in sidecar order with their on-disk dtypes"""
+    return [
+        (vertices, np.float64),
+        (edges, np.int32),
+        (face_offsets, np.int64),
+        (face_indices, np.int32),
+    ]
@@ -1,6 +1,13 @@
+import sys
 from gui import GUI
 
-def main():
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "render":
+        # Offline batch rendering of a scene file, no window is opened
+        from batch import main as render_main
+        return render_main(argv[1:])
+
     try:
         app = GUI(width=1024, height=768)
         app.run()
@@ -88,3 +88,45 @@ def degrees_to_radians(degrees):
 
 def radians_to_degrees(radians):
     return radians * 180 / math.pi
+
+
+def quaternions_from_euler(angles: np.ndarray) -> np.ndarray:
+    """
+    (K, 4) unit quaternions (w, x, y, z) for (K, 3) Euler angles in degrees,
+    applied X then Y then Z like Transform's Euler rotation
+    """
+    half = np.radians(np.asarray(angles, dtype=np.float64).reshape(-1, 3)) / 2
+    cx, cy, cz = np.cos(half).T
+    sx, sy, sz = np.sin(half).T
+    return np.stack([
+        cz * cy * cx + sz * sy * sx,
+        cz * cy * sx - sz * sy * cx,
+        cz * sy * cx + sz * cy * sx,
+        sz * cy * cx - cz * sy * sx,
+    ], axis=1)
+
+
+def quaternion_slerp(start: np.ndarray, end: np.ndarray, t) -> np.ndarray:
+    """
+    Spherical interpolation between (K, 4) unit quaternions at parameter t
+    (scalar or (K,)), along the shorter arc. Nearly parallel pairs fall
+    back to normalized linear interpolation.
+    """
+    start = np.asarray(start, dtype=np.float64).reshape(-1, 4)
+    end = np.asarray(end, dtype=np.float64).reshape(-1, 4)
+    t = np.broadcast_to(np.asarray(t, dtype=np.float64), (len(start),))[:, None]
+
+    # q and -q are the same rotation, flip to take the shorter way round
+    dot = np.einsum("ki,ki->k", start, end)[:, None]
+    end = np.where(dot < 0, -end, end)
+    dot = np.minimum(np.abs(dot), 1.0)
+
+    angle = np.arccos(dot)
+    sin_angle = np.sin(angle)
+    linear = sin_angle < 1e-6
+    safe = np.where(linear, 1.0, sin_angle)
+    start_weight = np.where(linear, 1 - t, np.sin((1 - t) * angle) / safe)
+    end_weight = np.where(linear, t, np.sin(t * angle) / safe)
+
+    result = start_weight * start + end_weight * end
+    return result / np.linalg.norm(result, axis=1, keepdims=True)
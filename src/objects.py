@@ -1,32 +1,395 @@
 from math_utils import Vector3
+from collections import OrderedDict
 from typing import List, Tuple
+import numpy as np
+import inspect
 import math
 
 class Object3D:
-    def __init__(self, name: str = "Object"):
+    # Starting capacity for array-backed storage, doubled whenever it fills up
+    INITIAL_CAPACITY = 16
+    # Clustering cells across the bounding box diagonal for the finest LOD,
+    # each further level halves it
+    LOD_BASE_CELLS = 64
+    # Meshes with more edges get LOD levels generated on first use
+    LOD_MIN_EDGES = 5_000
+
+    def __init__(self, name: str = "Object", array_backed: bool = False):
         self.name = name
-        self.vertices: List[Vector3] = []
-        self.edges: List[Tuple[int, int]] = []  # Pairs of vertex indices
+        self.array_backed = array_backed
         self.faces: List[List[int]] = []  # Lists of vertex indices for faces
+        # Bulk faces from set_faces in CSR layout, ahead of self.faces
+        self._face_offsets = np.zeros(1, dtype=np.int64)
+        self._face_indices = np.empty(0, dtype=np.int32)
+        self._triangles = None
+        self._triangles_key = None
+        # Bumped on every geometry change, derived data cached on the object
+        # (bounds, ...) is rebuilt when it no longer matches
+        self._geometry_version = 0
+        self._bounds = None
+        self._bounds_version = -1
+        # Back-face culling arrays per LOD level, see get_lod_culling()
+        self._culling = {}
+        self._culling_version = -1
+        # Simplified (vertex_array, edge_array, triangles) meshes, coarser with each level
+        self._lod_levels = []
+        self._lod_version = -1
+
+        if array_backed:
+            # Homogeneous (x, y, z, 1) rows and vertex index pairs, only the
+            # first _vertex_count/_edge_count rows are in use
+            self._vertex_data = np.empty((self.INITIAL_CAPACITY, 4), dtype=np.float64)
+            self._edge_data = np.empty((self.INITIAL_CAPACITY, 2), dtype=np.int32)
+            self._vertex_count = 0
+            self._edge_count = 0
+        else:
+            self._vertex_list: List[Vector3] = []
+            self._edge_list: List[Tuple[int, int]] = []  # Pairs of vertex indices
+
+    @classmethod
+    def from_arrays(cls, name: str, vertices, edges, validate: bool = True) -> "Object3D":
+        """Create an array-backed object from (N, 3) or (N, 4) vertices and (E, 2) edges"""
+        obj = cls(name, array_backed=True)
+        obj.set_geometry(vertices, edges, validate)
+        return obj
+
+    @property
+    def vertex_count(self) -> int:
+        if self.array_backed:
+            return self._vertex_count
+        return len(self._vertex_list)
+
+    @property
+    def edge_count(self) -> int:
+        if self.array_backed:
+            return self._edge_count
+        return len(self._edge_list)
+
+    @property
+    def vertices(self) -> List[Vector3]:
+        if self.array_backed:
+            return [Vector3(x, y, z) for x, y, z, _ in self.vertex_array.tolist()]
+        return self._vertex_list
+
+    @property
+    def edges(self) -> List[Tuple[int, int]]:
+        if self.array_backed:
+            return [(v1, v2) for v1, v2 in self.edge_array.tolist()]
+        return self._edge_list
+
+    @property
+    def vertex_array(self) -> np.ndarray:
+        """Vertices as an (N, 4) homogeneous float array"""
+        if self.array_backed:
+            return self._vertex_data[: self._vertex_count]
+
+        vertex_array = np.ones((len(self._vertex_list), 4), dtype=np.float64)
+        for i, vertex in enumerate(self._vertex_list):
+            vertex_array[i, 0] = vertex.x
+            vertex_array[i, 1] = vertex.y
+            vertex_array[i, 2] = vertex.z
+        return vertex_array
+
+    @property
+    def edge_array(self) -> np.ndarray:
+        """Edges as an (E, 2) int array of vertex indices"""
+        if self.array_backed:
+            return self._edge_data[: self._edge_count]
+        return np.array(self._edge_list, dtype=np.int32).reshape(-1, 2)
+
+    def set_geometry(self, vertices, edges, validate: bool = True):
+        """
+        Replace all vertices and edges of an array-backed object in one go.
+        validate=False skips the edge index range check, which has to read
+        every edge (e.g. for trusted memory-mapped data).
+        """
+        if not self.array_backed:
+            raise ValueError("set_geometry requires an array-backed object")
+
+        # Arrays that already have the right dtype are used without copying
+        vertices = np.asarray(vertices, dtype=np.float64)
+        edges = np.asarray(edges, dtype=np.int32).reshape(-1, 2)
+        if vertices.size == 0:
+            vertices = np.empty((0, 4), dtype=np.float64)
+
+        if vertices.ndim == 2 and vertices.shape[1] == 3:
+            homogeneous = np.ones((len(vertices), 4), dtype=np.float64)
+            homogeneous[:, :3] = vertices
+            vertices = homogeneous
+        elif vertices.ndim != 2 or vertices.shape[1] != 4:
+            raise ValueError("vertices must have shape (N, 3) or (N, 4)")
+
+        if validate and len(edges) and (edges.min() < 0 or edges.max() >= len(vertices)):
+            raise ValueError("edge indices out of range")
+
+        # Capacity matches the data exactly, so the first add_* call after
+        # this reallocates instead of writing into a caller-provided buffer
+        self._vertex_data = vertices
+        self._edge_data = edges
+        self._vertex_count = len(vertices)
+        self._edge_count = len(edges)
+        self._geometry_version += 1
+
+    def _grow(self, data: np.ndarray, count: int) -> np.ndarray:
+        """Return a buffer holding the first count rows of data with room for more"""
+        if count < len(data):
+            return data
+        capacity = max(self.INITIAL_CAPACITY, 2 * len(data))
+        grown = np.empty((capacity, data.shape[1]), dtype=data.dtype)
+        grown[:count] = data[:count]
+        return grown
 
     def add_vertex(self, x, y, z):
         """Add a vertex and return its index"""
-        self.vertices.append(Vector3(x, y, z))
-        return len(self.vertices) - 1
+        self._geometry_version += 1
+        if self.array_backed:
+            self._vertex_data = self._grow(self._vertex_data, self._vertex_count)
+            self._vertex_data[self._vertex_count] = (x, y, z, 1.0)
+            self._vertex_count += 1
+            return self._vertex_count - 1
+
+        self._vertex_list.append(Vector3(x, y, z))
+        return len(self._vertex_list) - 1
 
     def add_edge(self, v1_idx, v2_idx):
         """Add an edge between two vertices"""
-        if 0 <= v1_idx < len(self.vertices) and 0 <= v2_idx < len(self.vertices):
-            self.edges.append((v1_idx, v2_idx))
+        if not (0 <= v1_idx < self.vertex_count and 0 <= v2_idx < self.vertex_count):
+            return
+
+        self._geometry_version += 1
+        if self.array_backed:
+            self._edge_data = self._grow(self._edge_data, self._edge_count)
+            self._edge_data[self._edge_count] = (v1_idx, v2_idx)
+            self._edge_count += 1
+        else:
+            self._edge_list.append((v1_idx, v2_idx))
 
     def add_face(self, vertex_indices: List[int]):
         """Add a face defined by vertex indices"""
+        self._geometry_version += 1
         self.faces.append(vertex_indices)
 
+    def set_faces(self, face_offsets, face_indices):
+        """
+        Replace all faces with CSR arrays, face i being
+        face_indices[face_offsets[i]:face_offsets[i + 1]]. Faces are wound
+        counter-clockwise seen from outside.
+        """
+        self._face_offsets = np.asarray(face_offsets, dtype=np.int64)
+        self._face_indices = np.asarray(face_indices, dtype=np.int32)
+        self.faces = []
+        self._geometry_version += 1
+
+    @property
+    def face_count(self) -> int:
+        return len(self._face_offsets) - 1 + len(self.faces)
+
+    @property
+    def face_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """All faces as (F + 1) offsets and flat vertex indices"""
+        if not self.faces:
+            return self._face_offsets, self._face_indices
+        offsets, indices = _faces_to_csr(self.faces)
+        return (np.concatenate([self._face_offsets, offsets[1:] + self._face_offsets[-1]]),
+                np.concatenate([self._face_indices, indices]))
+
+    @property
+    def triangle_array(self) -> np.ndarray:
+        """Faces fan-triangulated into a (T, 3) int array, cached until the geometry changes"""
+        key = (self._geometry_version, len(self.faces))
+        if self._triangles_key != key:
+            self._triangles = triangulate_faces(*self.face_arrays)
+            self._triangles_key = key
+        return self._triangles
+
+    def _get_bounds(self):
+        if self._bounds_version != self._geometry_version:
+            vertex_array = self.vertex_array
+            if len(vertex_array):
+                low = vertex_array[:, :3].min(axis=0)
+                high = vertex_array[:, :3].max(axis=0)
+                center = (low + high) / 2
+                radius = float(np.sqrt(((vertex_array[:, :3] - center) ** 2).sum(axis=1).max()))
+            else:
+                low = high = center = np.zeros(3)
+                radius = 0.0
+            self._bounds = (low, high, center, radius)
+            self._bounds_version = self._geometry_version
+        return self._bounds
+
+    def get_bounding_box(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Axis-aligned (min, max) corners, cached until the geometry changes"""
+        low, high, _, _ = self._get_bounds()
+        return low, high
+
+    def get_bounding_sphere(self) -> Tuple[np.ndarray, float]:
+        """(center, radius) around the box center, cached until the geometry changes"""
+        _, _, center, radius = self._get_bounds()
+        return center, radius
+
+    def generate_lods(self, levels: int = 4):
+        """
+        Precompute up to levels simplified meshes by vertex clustering. Level
+        k merges vertices on a grid of LOD_BASE_CELLS / 2 ** (k - 1) cells
+        across the bounding box diagonal; levels that would not remove any
+        edges are not kept.
+        """
+        low, high, _, _ = self._get_bounds()
+        diagonal = float(np.linalg.norm(high - low))
+        vertex_array, edge_array = self.vertex_array, self.edge_array
+
+        self._lod_levels = []
+        previous_edges = len(edge_array)
+        for level in range(1, levels + 1):
+            if diagonal == 0:
+                break
+            # Every level clusters the full mesh, not the previous level
+            cells = max(1, self.LOD_BASE_CELLS >> (level - 1))
+            lod = _cluster_vertices(vertex_array, edge_array, low, diagonal / cells,
+                                    self.triangle_array)
+            if len(lod[1]) >= previous_edges:
+                break
+            self._lod_levels.append(lod)
+            previous_edges = len(lod[1])
+        self._lod_version = self._geometry_version
+
+    def ensure_lods(self):
+        """Generate the LOD levels of meshes over LOD_MIN_EDGES edges if they are missing or stale"""
+        if self._lod_version == self._geometry_version:
+            return
+        if self.edge_count > self.LOD_MIN_EDGES:
+            self.generate_lods()
+        else:
+            # Too small to be worth simplifying, remembered until the geometry changes
+            self._lod_levels = []
+            self._lod_version = self._geometry_version
+
+    @property
+    def lod_count(self) -> int:
+        """Number of levels, including the full mesh at level 0"""
+        if self._lod_version != self._geometry_version:
+            return 1
+        return 1 + len(self._lod_levels)
+
+    def get_lod(self, level: int):
+        """(vertex_array, edge_array) of a level, 0 being the full mesh"""
+        level = min(level, self.lod_count - 1)
+        if level <= 0:
+            return self.vertex_array, self.edge_array
+        return self._lod_levels[level - 1][:2]
+
+    def get_lod_triangles(self, level: int) -> np.ndarray:
+        """(T, 3) triangles of a level, indexing that level's vertices"""
+        level = min(level, self.lod_count - 1)
+        if level <= 0:
+            return self.triangle_array
+        return self._lod_levels[level - 1][2]
+
+    @property
+    def face_normals(self) -> np.ndarray:
+        """(T, 3) outward normals of triangle_array, cached until the geometry changes"""
+        return self.get_lod_culling(0)[0]
+
+    def get_lod_culling(self, level: int):
+        """
+        Arrays for back-face culling a level, cached until the geometry
+        changes: (T, 3) normals of its triangles, (T,) plane offsets n . p
+        of their first corners, (M, 2) pairs of (edge, triangle) indices for
+        every edge lying on a triangle side, and an (E,) mask of edges on no
+        triangle, which are never culled
+        """
+        level = max(min(level, self.lod_count - 1), 0)
+        if self._culling_version != self._geometry_version:
+            self._culling = {}
+            self._culling_version = self._geometry_version
+        culling = self._culling.get(level)
+        if culling is None:
+            vertex_array, edge_array = self.get_lod(level)
+            culling = _culling_arrays(vertex_array, edge_array, self.get_lod_triangles(level))
+            self._culling[level] = culling
+        return culling
+
+
+def _faces_to_csr(faces) -> Tuple[np.ndarray, np.ndarray]:
+    """(F + 1) offsets and flat indices of a sequence of vertex index sequences"""
+    sizes = np.fromiter((len(face) for face in faces), dtype=np.int64, count=len(faces))
+    offsets = np.zeros(len(faces) + 1, dtype=np.int64)
+    np.cumsum(sizes, out=offsets[1:])
+    indices = np.fromiter((i for face in faces for i in face), dtype=np.int32,
+                          count=int(offsets[-1]))
+    return offsets, indices
+
+
+def triangulate_faces(face_offsets: np.ndarray, face_indices: np.ndarray) -> np.ndarray:
+    """Fan-triangulate CSR faces into a (T, 3) int32 array, faces under 3 vertices are skipped"""
+    sizes = np.diff(face_offsets)
+    fans = np.maximum(sizes - 2, 0)
+    face = np.repeat(np.arange(len(sizes)), fans)
+    # Triangle k of a face is (v0, v(k + 1), v(k + 2))
+    k = np.arange(len(face)) - np.repeat(np.cumsum(fans) - fans, fans)
+    first = face_offsets[:-1][face]
+    return np.stack([
+        face_indices[first], face_indices[first + k + 1], face_indices[first + k + 2]
+    ], axis=1).astype(np.int32)
+
+
+def _culling_arrays(vertex_array: np.ndarray, edge_array: np.ndarray, triangles: np.ndarray):
+    """Triangle normals and plane offsets, (edge, triangle) adjacency pairs and the loose edge mask"""
+    corners = vertex_array[:, :3][triangles]
+    normals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+    offsets = np.einsum("ti,ti->t", normals, corners[:, 0])
+
+    if not len(edge_array):
+        return normals, offsets, np.empty((0, 2), dtype=np.int64), np.ones(0, dtype=bool)
+
+    # Match triangle sides to edges by their sorted vertex pair
+    vertex_count = len(vertex_array)
+    edge_keys = edge_array.min(axis=1).astype(np.int64) * vertex_count + edge_array.max(axis=1)
+    sides = np.stack([triangles, np.roll(triangles, -1, axis=1)], axis=2).reshape(-1, 2)
+    side_keys = sides.min(axis=1).astype(np.int64) * vertex_count + sides.max(axis=1)
+
+    order = np.argsort(edge_keys)
+    position = np.minimum(np.searchsorted(edge_keys, side_keys, sorter=order), len(order) - 1)
+    # Sides without an edge (fan diagonals) are skipped
+    matched = edge_keys[order[position]] == side_keys
+    pairs = np.stack([order[position[matched]], np.flatnonzero(matched) // 3], axis=1)
+
+    loose = np.ones(len(edge_array), dtype=bool)
+    loose[pairs[:, 0]] = False
+    return normals, offsets, pairs, loose
+
+
+def _cluster_vertices(vertex_array: np.ndarray, edge_array: np.ndarray,
+                      origin: np.ndarray, cell_size: float, triangles: np.ndarray):
+    """
+    Merge the vertices in each grid cell into their mean, dropping collapsed
+    and duplicate edges and collapsed triangles
+    """
+    cells = np.floor((vertex_array[:, :3] - origin) / cell_size).astype(np.int64)
+    cells -= cells.min(axis=0)
+    span = cells.max(axis=0) + 1
+    keys = (cells[:, 0] * span[1] + cells[:, 1]) * span[2] + cells[:, 2]
+    _, cluster = np.unique(keys, return_inverse=True)
+
+    counts = np.bincount(cluster)
+    vertices = np.ones((len(counts), 4), dtype=np.float64)
+    for axis in range(3):
+        vertices[:, axis] = np.bincount(cluster, weights=vertex_array[:, axis]) / counts
+
+    edges = np.sort(cluster[edge_array], axis=1)
+    edges = edges[edges[:, 0] != edges[:, 1]]
+    edge_keys = np.unique(edges[:, 0] * len(counts) + edges[:, 1])
+    edges = np.stack([edge_keys // len(counts), edge_keys % len(counts)], axis=1)
+
+    triangles = cluster[triangles]
+    triangles = triangles[(triangles[:, 0] != triangles[:, 1]) &
+                          (triangles[:, 1] != triangles[:, 2]) &
+                          (triangles[:, 2] != triangles[:, 0])]
+    return vertices, edges.astype(np.int32), triangles.astype(np.int32)
+
 
 def create_cube(size = 1.0) -> Object3D:
     """Create a cube centered at origin"""
-    cube = Object3D("Cube")
     half_size = size / 2
 
     # Origin is at center of the cube
@@ -42,9 +405,6 @@ def create_cube(size = 1.0) -> Object3D:
         (-half_size, half_size, half_size), 
     ]
 
-    for x, y, z in vertices:
-        cube.add_vertex(x, y, z)
-
     # Define edges
     edges = [
         # Back face
@@ -64,45 +424,51 @@ def create_cube(size = 1.0) -> Object3D:
         (3, 7),
     ]
 
-    for v1, v2 in edges:
-        cube.add_edge(v1, v2)
+    # Faces wound counter-clockwise seen from outside
+    faces = [(0, 3, 2, 1), (4, 5, 6, 7), (0, 1, 5, 4), (3, 7, 6, 2), (0, 4, 7, 3), (1, 2, 6, 5)]
 
-    return cube
+    obj = Object3D.from_arrays("Cube", vertices, edges)
+    obj.set_faces(*_faces_to_csr(faces))
+    return obj
 
 
 def create_pyramid(base_size = 1.0, height = 1.0) -> Object3D:
     """Create a pyramid with square base"""
-    pyramid = Object3D("Pyramid")
     half_base = base_size / 2
 
     # Origin is at center of the pyramid
-    # Base vertices
-    pyramid.add_vertex(-half_base, -height / 2, -half_base) 
-    pyramid.add_vertex(half_base, -height / 2, -half_base) 
-    pyramid.add_vertex(half_base, -height / 2, half_base)  
-    pyramid.add_vertex(-half_base, -height / 2, half_base) 
-    # Apex vertex
-    pyramid.add_vertex(0, height / 2, 0)  
-    
-    # Base edges
-    pyramid.add_edge(0, 1)
-    pyramid.add_edge(1, 2)
-    pyramid.add_edge(2, 3)
-    pyramid.add_edge(3, 0)
-
-    # Edges to apex
-    pyramid.add_edge(0, 4)
-    pyramid.add_edge(1, 4)
-    pyramid.add_edge(2, 4)
-    pyramid.add_edge(3, 4)
-
-    return pyramid
+    vertices = [
+        # Base vertices
+        (-half_base, -height / 2, -half_base),
+        (half_base, -height / 2, -half_base),
+        (half_base, -height / 2, half_base),
+        (-half_base, -height / 2, half_base),
+        # Apex vertex
+        (0, height / 2, 0),
+    ]
+
+    edges = [
+        # Base edges
+        (0, 1),
+        (1, 2),
+        (2, 3),
+        (3, 0),
+        # Edges to apex
+        (0, 4),
+        (1, 4),
+        (2, 4),
+        (3, 4),
+    ]
+
+    faces = [(0, 1, 2, 3), (0, 4, 1), (1, 4, 2), (2, 4, 3), (3, 4, 0)]
+
+    obj = Object3D.from_arrays("Pyramid", vertices, edges)
+    obj.set_faces(*_faces_to_csr(faces))
+    return obj
 
 
 def create_tetrahedron(size = 1.0) -> Object3D:
     """Create a regular tetrahedron"""
-    tetrahedron = Object3D("Tetrahedron")
-
     # Origin is at center of the tetrahedron
     # Regular tetrahedron vertices
     a = size / math.sqrt(2)
@@ -113,29 +479,27 @@ def create_tetrahedron(size = 1.0) -> Object3D:
         (a, -a, -a), 
     ]
 
-    for x, y, z in vertices:
-        tetrahedron.add_vertex(x, y, z)
-
     # All edges (every vertex connects to every other vertex)
     edges = [(0, 1), (0, 2), (0, 3), (1, 2), (1, 3), (2, 3)]
-    for v1, v2 in edges:
-        tetrahedron.add_edge(v1, v2)
+    faces = [(0, 1, 3), (0, 2, 1), (0, 3, 2), (1, 2, 3)]
 
-    return tetrahedron
+    obj = Object3D.from_arrays("Tetrahedron", vertices, edges)
+    obj.set_faces(*_faces_to_csr(faces))
+    return obj
 
 
 def create_octahedron(size = 1.0) -> Object3D:
     """Create a regular octahedron"""
-    octahedron = Object3D("Octahedron")
-
     # Origin is at center of the octahedron
     # Octahedron vertices (6 vertices at unit distance from center)
-    octahedron.add_vertex(size, 0, 0)
-    octahedron.add_vertex(-size, 0, 0)
-    octahedron.add_vertex(0, size, 0) 
-    octahedron.add_vertex(0, -size, 0)
-    octahedron.add_vertex(0, 0, size) 
-    octahedron.add_vertex(0, 0, -size)
+    vertices = [
+        (size, 0, 0),
+        (-size, 0, 0),
+        (0, size, 0),
+        (0, -size, 0),
+        (0, 0, size),
+        (0, 0, -size),
+    ]
 
     # Edges connecting vertices
     edges = [
@@ -156,22 +520,287 @@ def create_octahedron(size = 1.0) -> Object3D:
         (3, 5),
     ]
 
-    for v1, v2 in edges:
-        octahedron.add_edge(v1, v2)
+    faces = [
+        (0, 2, 4), (0, 5, 2), (0, 4, 3), (0, 3, 5),
+        (1, 4, 2), (1, 2, 5), (1, 3, 4), (1, 5, 3),
+    ]
+
+    obj = Object3D.from_arrays("Octahedron", vertices, edges)
+    obj.set_faces(*_faces_to_csr(faces))
+    return obj
+
+
+def _parametric_edges(rows: int, columns: int, wrap_rows: bool = False,
+                      wrap_columns: bool = False) -> np.ndarray:
+    """Edges of a rows x columns vertex lattice, optionally closed in either direction"""
+    index = np.arange(rows * columns).reshape(rows, columns)
+    along = index if wrap_columns else index[:, :-1]
+    across = index if wrap_rows else index[:-1, :]
+    return np.concatenate([
+        np.stack([along.ravel(), np.roll(index, -1, axis=1)[:, :along.shape[1]].ravel()], axis=1),
+        np.stack([across.ravel(), np.roll(index, -1, axis=0)[:across.shape[0], :].ravel()], axis=1),
+    ])
+
+
+def _parametric_faces(rows: int, columns: int, wrap_rows: bool = False,
+                      wrap_columns: bool = False) -> np.ndarray:
+    """(F, 4) quads of a rows x columns vertex lattice, (r, c) -> (r, c + 1) -> (r + 1, c + 1)"""
+    index = np.arange(rows * columns).reshape(rows, columns)
+    right = np.roll(index, -1, axis=1)
+    below = np.roll(index, -1, axis=0)
+    diagonal = np.roll(right, -1, axis=0)
+    quads = np.stack([index, right, diagonal, below], axis=-1)
+    quads = quads if wrap_rows else quads[:-1]
+    quads = quads if wrap_columns else quads[:, :-1]
+    return quads.reshape(-1, 4)
+
+
+def _polygon_faces(*blocks: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """CSR (offsets, indices) of (F, k) face blocks, each block of k-gons"""
+    sizes = np.concatenate([np.full(len(block), block.shape[1], dtype=np.int64) for block in blocks])
+    offsets = np.zeros(len(sizes) + 1, dtype=np.int64)
+    np.cumsum(sizes, out=offsets[1:])
+    indices = np.concatenate([block.ravel() for block in blocks]).astype(np.int32)
+    return offsets, indices
+
+
+def _triangle_edges(triangles: np.ndarray, vertex_count: int):
+    """
+    Unique undirected edges of an (F, 3) triangle array, plus the index
+    into them of every triangle side as an (F, 3) array
+    """
+    sides = np.sort(triangles[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2), axis=1)
+    # One int64 key per edge is much faster to deduplicate than rows
+    keys = sides[:, 0].astype(np.int64) * vertex_count + sides[:, 1]
+    unique, inverse = np.unique(keys, return_inverse=True)
+    edges = np.stack([unique // vertex_count, unique % vertex_count], axis=1)
+    return edges, inverse.reshape(-1, 3)
+
+
+def create_uv_sphere(radius = 1.0, segments = 24, rings = 16) -> Object3D:
+    """Create a UV sphere from latitude rings and longitude segments"""
+    # Ring vertices, poles excluded
+    theta = np.linspace(0, math.pi, rings + 1)[1:-1]
+    phi = np.linspace(0, 2 * math.pi, segments, endpoint=False)
+    theta, phi = np.meshgrid(theta, phi, indexing="ij")
+    ring_vertices = np.stack([
+        radius * np.sin(theta) * np.cos(phi),
+        radius * np.cos(theta),
+        radius * np.sin(theta) * np.sin(phi),
+    ], axis=-1).reshape(-1, 3)
+    vertices = np.concatenate([ring_vertices, [(0, radius, 0), (0, -radius, 0)]])
+
+    # Latitude loops and longitude lines, then each pole to its nearest ring
+    edges = _parametric_edges(rings - 1, segments, wrap_columns=True)
+    top, bottom = len(ring_vertices), len(ring_vertices) + 1
+    first_ring = np.arange(segments)
+    last_ring = np.arange(segments) + (rings - 2) * segments
+    edges = np.concatenate([
+        edges,
+        np.stack([np.full(segments, top), first_ring], axis=1),
+        np.stack([np.full(segments, bottom), last_ring], axis=1),
+    ])
+
+    # Quads between rings, triangle fans around the poles
+    quads = _parametric_faces(rings - 1, segments, wrap_columns=True)
+    next_first = np.roll(first_ring, -1)
+    next_last = np.roll(last_ring, -1)
+    top_cap = np.stack([np.full(segments, top), next_first, first_ring], axis=1)
+    bottom_cap = np.stack([np.full(segments, bottom), last_ring, next_last], axis=1)
+
+    obj = Object3D.from_arrays("UV Sphere", vertices, edges)
+    obj.set_faces(*_polygon_faces(quads, top_cap, bottom_cap))
+    return obj
+
+
+def create_torus(major_radius = 1.0, minor_radius = 0.4, major_segments = 32,
+                 minor_segments = 16) -> Object3D:
+    """Create a torus around the Y axis"""
+    u = np.linspace(0, 2 * math.pi, major_segments, endpoint=False)
+    v = np.linspace(0, 2 * math.pi, minor_segments, endpoint=False)
+    u, v = np.meshgrid(u, v, indexing="ij")
+    tube = major_radius + minor_radius * np.cos(v)
+    vertices = np.stack([
+        tube * np.cos(u), minor_radius * np.sin(v), tube * np.sin(u)
+    ], axis=-1).reshape(-1, 3)
+
+    edges = _parametric_edges(major_segments, minor_segments, wrap_rows=True, wrap_columns=True)
+    faces = _parametric_faces(major_segments, minor_segments, wrap_rows=True, wrap_columns=True)
 
-    return octahedron
+    obj = Object3D.from_arrays("Torus", vertices, edges)
+    obj.set_faces(*_polygon_faces(faces))
+    return obj
+
+
+def create_grid(size = 2.0, divisions = 10) -> Object3D:
+    """Create a flat subdivided grid in the XZ plane"""
+    coords = np.linspace(-size / 2, size / 2, divisions + 1)
+    x, z = np.meshgrid(coords, coords, indexing="ij")
+    vertices = np.stack([x, np.zeros_like(x), z], axis=-1).reshape(-1, 3)
+
+    edges = _parametric_edges(divisions + 1, divisions + 1)
+    # Facing +Y
+    faces = _parametric_faces(divisions + 1, divisions + 1)
+
+    obj = Object3D.from_arrays("Grid", vertices, edges)
+    obj.set_faces(*_polygon_faces(faces))
+    return obj
+
+
+def create_cylinder(radius = 1.0, height = 2.0, segments = 24) -> Object3D:
+    """Create an open cylinder along the Y axis"""
+    phi = np.linspace(0, 2 * math.pi, segments, endpoint=False)
+    y = np.array([-height / 2, height / 2])
+    y, phi = np.meshgrid(y, phi, indexing="ij")
+    vertices = np.stack([
+        radius * np.cos(phi), y, radius * np.sin(phi)
+    ], axis=-1).reshape(-1, 3)
+
+    # Bottom and top circles plus the vertical edges between them
+    edges = _parametric_edges(2, segments, wrap_columns=True)
+    # Side quads only, the caps are open
+    faces = _parametric_faces(2, segments, wrap_columns=True)[:, ::-1]
+
+    obj = Object3D.from_arrays("Cylinder", vertices, edges)
+    obj.set_faces(*_polygon_faces(faces))
+    return obj
+
+
+def create_icosphere(radius = 1.0, level = 2) -> Object3D:
+    """Create an icosphere by subdividing an icosahedron level times"""
+    t = (1 + math.sqrt(5)) / 2
+    vertices = np.array([
+        (-1, t, 0), (1, t, 0), (-1, -t, 0), (1, -t, 0),
+        (0, -1, t), (0, 1, t), (0, -1, -t), (0, 1, -t),
+        (t, 0, -1), (t, 0, 1), (-t, 0, -1), (-t, 0, 1),
+    ], dtype=np.float64)
+    triangles = np.array([
+        (0, 11, 5), (0, 5, 1), (0, 1, 7), (0, 7, 10), (0, 10, 11),
+        (1, 5, 9), (5, 11, 4), (11, 10, 2), (10, 7, 6), (7, 1, 8),
+        (3, 9, 4), (3, 4, 2), (3, 2, 6), (3, 6, 8), (3, 8, 9),
+        (4, 9, 5), (2, 4, 11), (6, 2, 10), (8, 6, 7), (9, 8, 1),
+    ], dtype=np.int64)
+    vertices /= np.linalg.norm(vertices, axis=1, keepdims=True)
+
+    for _ in range(level):
+        # One new vertex per unique edge, shared by both adjacent triangles
+        edges, sides = _triangle_edges(triangles, len(vertices))
+        midpoints = vertices[edges[:, 0]] + vertices[edges[:, 1]]
+        midpoints /= np.linalg.norm(midpoints, axis=1, keepdims=True)
+
+        mid = sides + len(vertices)
+        a, b, c = triangles.T
+        ab, bc, ca = mid.T
+        triangles = np.concatenate([
+            np.stack([a, ab, ca], axis=1), np.stack([b, bc, ab], axis=1),
+            np.stack([c, ca, bc], axis=1), np.stack([ab, bc, ca], axis=1),
+        ])
+        vertices = np.concatenate([vertices, midpoints])
+
+    edges, _ = _triangle_edges(triangles, len(vertices))
+    obj = Object3D.from_arrays("Icosphere", vertices * radius, edges)
+    obj.set_faces(*_polygon_faces(triangles))
+    return obj
+
+
+class GeometryCache:
+    """
+    LRU cache of generated geometry bounded by total array bytes. Cached
+    arrays are read-only and shared by every object created from them.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key, name: str, vertices: np.ndarray, edges: np.ndarray,
+            face_offsets: np.ndarray = None, face_indices: np.ndarray = None):
+        """Store copies of the arrays, returns the cached entry or None if it is too large"""
+        if face_offsets is None:
+            face_offsets = np.zeros(1, dtype=np.int64)
+            face_indices = np.empty(0, dtype=np.int32)
+        size = vertices.nbytes + edges.nbytes + face_offsets.nbytes + face_indices.nbytes
+        if key in self._entries:
+            self.total_bytes -= self._entry_bytes(self._entries.pop(key))
+        self._evict(self.max_bytes - size)
+        if size > self.max_bytes:
+            return None
+
+        # Copies own their memory, so no writable view of them survives
+        arrays = []
+        for array in (vertices, edges, face_offsets, face_indices):
+            array = array.copy()
+            array.flags.writeable = False
+            arrays.append(array)
+
+        entry = (name, *arrays)
+        self._entries[key] = entry
+        self.total_bytes += size
+        return entry
+
+    def _evict(self, budget: int):
+        """Drop least recently used entries until at most budget bytes remain"""
+        while self._entries and self.total_bytes > budget:
+            _, evicted = self._entries.popitem(last=False)
+            self.total_bytes -= self._entry_bytes(evicted)
+
+    def clear(self):
+        self._entries.clear()
+        self.total_bytes = 0
+
+    @staticmethod
+    def _entry_bytes(entry) -> int:
+        return sum(array.nbytes for array in entry[1:])
+
+
+OBJECT_TYPES = {
+    "cube": create_cube,
+    "pyramid": create_pyramid,
+    "tetrahedron": create_tetrahedron,
+    "octahedron": create_octahedron,
+    "sphere": create_uv_sphere,
+    "torus": create_torus,
+    "grid": create_grid,
+    "cylinder": create_cylinder,
+    "icosphere": create_icosphere,
+}
+
+geometry_cache = GeometryCache()
 
 
 # Factory function
 def create_object(object_type: str, **kwargs) -> Object3D:
-    """Factory function to create different types of 3D objects"""
-    if object_type.lower() == "cube":
-        return create_cube(kwargs.get("size", 1.0))
-    elif object_type.lower() == "pyramid":
-        return create_pyramid(kwargs.get("base_size", 1.0), kwargs.get("height", 1.0))
-    elif object_type.lower() == "tetrahedron":
-        return create_tetrahedron(kwargs.get("size", 1.0))
-    elif object_type.lower() == "octahedron":
-        return create_octahedron(kwargs.get("size", 1.0))
-    else:
-        return create_cube()
+    """
+    Factory function to create different types of 3D objects. Geometry is
+    memoized by type and parameters, so repeated calls share the same
+    read-only arrays; adding vertices or edges copies them first.
+    """
+    generator = OBJECT_TYPES.get(object_type.lower(), create_cube)
+
+    # Bind with defaults so equivalent calls share a cache entry, unknown
+    # parameters are ignored as before
+    signature = inspect.signature(generator)
+    params = {k: v for k, v in kwargs.items() if k in signature.parameters}
+    bound = signature.bind(**params)
+    bound.apply_defaults()
+    key = (generator.__name__, tuple(bound.arguments.items()))
+
+    cached = geometry_cache.get(key)
+    if cached is None:
+        obj = generator(**bound.arguments)
+        cached = geometry_cache.put(key, obj.name, obj.vertex_array, obj.edge_array,
+                                    *obj.face_arrays)
+        if cached is None:
+            return obj
+
+    name, vertices, edges, face_offsets, face_indices = cached
+    obj = Object3D.from_arrays(name, vertices, edges, validate=False)
+    obj.set_faces(face_offsets, face_indices)
+    return obj
@@ -0,0 +1,174 @@
+import multiprocessing
+from multiprocessing import shared_memory
+import numpy as np
+import pygame
+from renderer import LineRenderer
+
+# Shared buffers a worker has attached to, by role, so each frame only
+# reattaches when the main process had to grow a buffer
+_attached = {}
+
+
+def _attach(role: str, name: str) -> shared_memory.SharedMemory:
+    shm = _attached.get(role)
+    if shm is None or shm.name != name:
+        if shm is not None:
+            shm.close()
+        shm = shared_memory.SharedMemory(name=name)
+        _attached[role] = shm
+    return shm
+
+
+def _rasterize_tile(task):
+    """Pool worker: draw the pixels of lines[begin:end] inside one tile into the framebuffer"""
+    framebuffer_name, size, lines_name, line_capacity, rect, begin, end, color, width = task
+    framebuffer = np.ndarray(size, dtype=np.uint32,
+                             buffer=_attach("framebuffer", framebuffer_name).buf)
+    lines = np.ndarray((line_capacity, 4), dtype=np.int64,
+                       buffer=_attach("lines", lines_name).buf)
+
+    if width > 1:
+        xs, ys = LineRenderer.thick_line_pixels(lines[begin:end, :2], lines[begin:end, 2:],
+                                                size[0], size[1], width, area=rect)
+    else:
+        xs, ys = LineRenderer.dda_pixels(lines[begin:end, :2], lines[begin:end, 2:],
+                                         size[0], size[1], area=rect)
+    # Tiles never overlap, so workers write without any locking
+    framebuffer[xs, ys] = color
+    return len(xs)
+
+
+class ParallelLineRenderer(LineRenderer):
+    """
+    LineRenderer that bins lines into screen tiles and rasterizes the tiles
+    in a multiprocessing pool. Workers write into a framebuffer in shared
+    memory which is blitted to the surface once per draw_lines call.
+    Output is pixel identical to LineRenderer.draw_lines, including its
+    one pixel deviations from dda_line on lines clipped at the screen edge.
+    """
+
+    # Tile edge in pixels, smaller tiles balance better but duplicate more lines
+    TILE_SIZE = 128
+    # Below this many lines the pool round trip costs more than it saves
+    MIN_PARALLEL_LINES = 4096
+
+    def __init__(self, workers: int = None):
+        super().__init__()
+        self.workers = workers or multiprocessing.cpu_count()
+        self._pool = None
+        self._framebuffer = None
+        self._lines = None
+
+    def _get_pool(self):
+        if self._pool is None:
+            self._pool = multiprocessing.Pool(self.workers)
+        return self._pool
+
+    @staticmethod
+    def _ensure_buffer(shm, nbytes: int) -> shared_memory.SharedMemory:
+        """Return shm if it holds nbytes, otherwise a new buffer with room to grow"""
+        if shm is not None and shm.size >= nbytes:
+            return shm
+        capacity = max(nbytes, 2 * shm.size if shm is not None else 0)
+        if shm is not None:
+            shm.close()
+            shm.unlink()
+        return shared_memory.SharedMemory(create=True, size=capacity)
+
+    def bin_lines(self, starts, ends, width, height, pad = 0):
+        """
+        Assign every line to each tile its bounding box, grown by pad pixels,
+        overlaps. Returns (line indices, tile ids) sorted by tile and the
+        tile columns count.
+        """
+        tile = self.TILE_SIZE
+        tiles_x = -(-width // tile)
+
+        # DDA samples lie between the integer endpoints and round within them
+        low = np.minimum(starts, ends) - pad
+        high = np.maximum(starts, ends) + pad
+        onscreen = ((high[:, 0] >= 0) & (low[:, 0] < width) &
+                    (high[:, 1] >= 0) & (low[:, 1] < height))
+        lines = np.flatnonzero(onscreen)
+        first = np.clip(low[lines], 0, [width - 1, height - 1]) // tile
+        last = np.clip(high[lines], 0, [width - 1, height - 1]) // tile
+
+        # Expand each line into the tiles of its (columns x rows) range
+        columns = last[:, 0] - first[:, 0] + 1
+        counts = columns * (last[:, 1] - first[:, 1] + 1)
+        repeated = np.repeat(np.arange(len(lines)), counts)
+        within = np.arange(len(repeated)) - np.repeat(np.cumsum(counts) - counts, counts)
+        tile_x = first[repeated, 0] + within % columns[repeated]
+        tile_y = first[repeated, 1] + within // columns[repeated]
+        tile_ids = tile_y * tiles_x + tile_x
+
+        order = np.argsort(tile_ids, kind="stable")
+        return lines[repeated[order]], tile_ids[order], tiles_x
+
+    def draw_lines(self, surface, starts, ends, color = (255, 255, 255), width = 1):
+        """Batched draw_line rasterized tile by tile across the worker pool"""
+        starts = np.asarray(starts, dtype=np.int64).reshape(-1, 2)
+        ends = np.asarray(ends, dtype=np.int64).reshape(-1, 2)
+        if len(starts) < self.MIN_PARALLEL_LINES or self.workers < 2:
+            super().draw_lines(surface, starts, ends, color, width)
+            return
+
+        screen_width = surface.get_width()
+        screen_height = surface.get_height()
+        # Thick lines reach tiles up to the brush radius past their box
+        pad = width // 2 + 1 if width > 1 else 0
+        lines, tile_ids, tiles_x = self.bin_lines(starts, ends, screen_width, screen_height, pad)
+        if not len(lines):
+            return
+
+        # Lines stored tile by tile so a task is just a slice
+        self._lines = self._ensure_buffer(self._lines, len(lines) * 4 * 8)
+        line_capacity = self._lines.size // (4 * 8)
+        shared_lines = np.ndarray((line_capacity, 4), dtype=np.int64, buffer=self._lines.buf)
+        shared_lines[:len(lines), :2] = starts[lines]
+        shared_lines[:len(lines), 2:] = ends[lines]
+
+        # Start from the current surface so earlier draws are kept
+        size = (screen_width, screen_height)
+        self._framebuffer = self._ensure_buffer(self._framebuffer,
+                                                screen_width * screen_height * 4)
+        framebuffer = np.ndarray(size, dtype=np.uint32, buffer=self._framebuffer.buf)
+        framebuffer[:] = pygame.surfarray.array2d(surface)
+
+        mapped = surface.map_rgb(color)
+        tiles, begins = np.unique(tile_ids, return_index=True)
+        ends_at = np.append(begins[1:], len(tile_ids))
+        tasks = []
+        for tile_id, begin, end in zip(tiles.tolist(), begins.tolist(), ends_at.tolist()):
+            left = (tile_id % tiles_x) * self.TILE_SIZE
+            top = (tile_id // tiles_x) * self.TILE_SIZE
+            rect = (left, top, min(left + self.TILE_SIZE, screen_width),
+                    min(top + self.TILE_SIZE, screen_height))
+            tasks.append((self._framebuffer.name, size, self._lines.name, line_capacity,
+                          rect, begin, end, mapped, width))
+
+        # Busiest tiles first so the stragglers are the cheap ones
+        tasks.sort(key=lambda task: task[5] - task[6])
+        self._get_pool().map(_rasterize_tile, tasks, chunksize=1)
+
+        pygame.surfarray.blit_array(surface, framebuffer)
+        del framebuffer, shared_lines
+
+    def close(self):
+        """Stop the worker pool and release the shared buffers"""
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+        for shm in (self._framebuffer, self._lines):
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+        self._framebuffer = None
+        self._lines = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,56 @@
+import queue
+import threading
+
+class RenderThread:
+    """
+    Runs one frame job at a time on a background thread, so the caller can
+    prepare frame N+1 while frame N is being drawn. submit() hands over a
+    job, wait() blocks until it is done and returns its result.
+    """
+
+    def __init__(self, name: str = "render"):
+        self._jobs = queue.Queue(maxsize=1)
+        self._done = threading.Event()
+        self._done.set()
+        self._result = None
+        self._error = None
+        # True between submit() and the wait() that collects the result
+        self.pending = False
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            function, args = job
+            try:
+                self._result = function(*args)
+            except BaseException as error:
+                self._error = error
+            self._done.set()
+
+    def submit(self, function, *args):
+        """Start function(*args) on the thread, after the previous job finished"""
+        if self.pending:
+            self.wait()
+        self._done.clear()
+        self.pending = True
+        self._jobs.put((function, args))
+
+    def wait(self):
+        """Block until the submitted job is done and return its result, re-raising its errors"""
+        self._done.wait()
+        self.pending = False
+        result, error = self._result, self._error
+        self._result = self._error = None
+        if error is not None:
+            raise error
+        return result
+
+    def close(self):
+        """Finish the current job and stop the thread"""
+        self._done.wait()
+        self._jobs.put(None)
+        self._thread.join()
@@ -0,0 +1,198 @@
+import json
+import math
+import os
+import threading
+import time
+
+class _NullStage:
+    """Context manager that does nothing, handed out while profiling is off"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    """
+    Reusable timer for one named stage, records into its profiler on exit.
+    Start times are kept per thread on a stack, so the stage can be timed
+    from several threads at once and entered again while it is running.
+    """
+    __slots__ = ("profiler", "name", "_local")
+
+    def __init__(self, profiler, name: str):
+        self.profiler = profiler
+        self.name = name
+        self._local = threading.local()
+
+    def __enter__(self):
+        starts = getattr(self._local, "starts", None)
+        if starts is None:
+            starts = self._local.starts = []
+        starts.append(time.perf_counter_ns())
+        return self
+
+    def __exit__(self, *exc):
+        start = self._local.starts.pop()
+        self.profiler.record(self.name, start, time.perf_counter_ns() - start)
+        return False
+
+
+class RollingHistogram:
+    """
+    Log-spaced histogram of the last WINDOW samples. Each sample only
+    increments and decrements bin counts, so percentiles cost O(bins)
+    no matter how many samples went in.
+    """
+
+    WINDOW = 240
+    # Bins from 1 microsecond to 10 seconds, 20 per decade
+    FIRST_DECADE = 3
+    BINS_PER_DECADE = 20
+    BIN_COUNT = 7 * BINS_PER_DECADE + 1
+
+    def __init__(self):
+        self.counts = [0] * self.BIN_COUNT
+        self.ring = [0] * self.WINDOW
+        self.size = 0
+        self.position = 0
+
+    def add(self, duration_ns: int):
+        # Plain Python math, a numpy call per sample would dominate the cost
+        scaled = (math.log10(max(duration_ns, 1)) - self.FIRST_DECADE) * self.BINS_PER_DECADE
+        index = min(max(math.ceil(scaled), 0), self.BIN_COUNT - 1)
+        if self.size == self.WINDOW:
+            self.counts[self.ring[self.position]] -= 1
+        else:
+            self.size += 1
+        self.ring[self.position] = index
+        self.counts[index] += 1
+        self.position = (self.position + 1) % self.WINDOW
+
+    def percentile(self, q: float) -> float:
+        """Upper edge in ms of the bin holding the q-th percentile, 0 if empty"""
+        if not self.size:
+            return 0.0
+        rank = q / 100 * self.size
+        total = 0
+        for index, count in enumerate(self.counts):
+            total += count
+            if total >= rank:
+                break
+        return 10 ** (self.FIRST_DECADE + index / self.BINS_PER_DECADE) / 1e6
+
+
+class FrameProfiler:
+    """
+    Per-stage frame timings. Wrap work in `with profiler.stage(name):` to
+    feed a rolling histogram per stage and, while tracing, a Chrome trace
+    (chrome://tracing or Perfetto). Disabled profilers hand out a shared
+    no-op context, so the hooks can stay in the frame loop.
+
+    Stages may be timed from any thread; recording and reading the
+    histograms and trace events share one lock.
+    """
+
+    # Trace events kept before recording stops on its own, ~100 MB of JSON
+    MAX_TRACE_EVENTS = 1_000_000
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.tracing = False
+        self.histograms = {}
+        self._stages = {}
+        self._trace_events = []
+        self._origin_ns = time.perf_counter_ns()
+        self._lock = threading.Lock()
+
+    def stage(self, name: str):
+        if not self.enabled:
+            return _NULL_STAGE
+        timer = self._stages.get(name)
+        if timer is None:
+            with self._lock:
+                timer = self._stages.setdefault(name, _Stage(self, name))
+        return timer
+
+    def record(self, name: str, start_ns: int, duration_ns: int):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = RollingHistogram()
+            histogram.add(duration_ns)
+
+            if self.tracing:
+                self._trace_events.append((name, start_ns, duration_ns, threading.get_ident()))
+                if len(self._trace_events) >= self.MAX_TRACE_EVENTS:
+                    self.tracing = False
+
+    def toggle(self):
+        self.enabled = not self.enabled
+
+    def percentiles(self, name: str, quantiles=(50, 95, 99)):
+        """Percentiles of a stage's recent durations in ms"""
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                return tuple(0.0 for _ in quantiles)
+            return tuple(histogram.percentile(q) for q in quantiles)
+
+    def summary(self):
+        """List of (stage, p50, p95, p99) in first-seen order"""
+        with self._lock:
+            names = list(self.histograms)
+        return [(name, *self.percentiles(name)) for name in names]
+
+    def start_trace(self):
+        """Begin recording trace events, profiling is switched on if needed"""
+        with self._lock:
+            self.enabled = True
+            self.tracing = True
+            self._trace_events = []
+
+    def stop_trace(self):
+        self.tracing = False
+
+    def export_chrome_trace(self, path: str):
+        """Write the recorded events as Chrome trace JSON complete ("X") events"""
+        pid = os.getpid()
+        with self._lock:
+            recorded = list(self._trace_events)
+        events = [
+            {
+                "name": name,
+                "cat": "frame",
+                "ph": "X",
+                # Trace timestamps and durations are in microseconds
+                "ts": (start - self._origin_ns) / 1000,
+                "dur": duration / 1000,
+                "pid": pid,
+                "tid": tid,
+            }
+            for name, start, duration, tid in recorded
+        ]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        return len(events)
+
+    def overlay_lines(self):
+        """Fixed-width p50/p95/p99 table rows of every stage, header first"""
+        lines = [f"{'stage':<14}{'p50':>7}{'p95':>7}{'p99':>7} ms"]
+        for name, p50, p95, p99 in self.summary():
+            lines.append(f"{name:<14}{p50:>7.2f}{p95:>7.2f}{p99:>7.2f}   ")
+        return lines
+
+    def draw_overlay(self, surface, font, position=None, color=(255, 255, 0)):
+        """Draw the overlay_lines() table, top right by default"""
+        lines = self.overlay_lines()
+        rendered = [font.render(line, True, color) for line in lines]
+        width = max(text.get_width() for text in rendered)
+        x, y = position or (surface.get_width() - width - 10, 10)
+        for text in rendered:
+            surface.blit(text, (x, y))
+            y += text.get_height() + 2
@@ -1,81 +1,302 @@
 from math_utils import Vector3
+from transformations import euler_rotation
 from typing import List, Tuple
+import numpy as np
 import math
 
+# Screen coordinates beyond this are treated as invalid rather than cast to int32
+SCREEN_COORD_LIMIT = 2 ** 30
+
+# Edges are clipped slightly in front of the near plane so the new
+# endpoints still count as in front of it after rounding
+NEAR_CLIP_EPSILON = 1e-6
+
+class Camera:
+    """
+    Viewer position and Euler rotation in degrees. View space has +X to
+    the right, +Y up and looks down +Z; the default camera sits at
+    z = -8 facing the origin, where the projections have always viewed
+    the scene from.
+    """
+
+    def __init__(self, position: Vector3 = None):
+        self.position = position or Vector3(0, 0, -8)
+        self.rotation = Vector3(0, 0, 0)
+        # View matrix and the (position, rotation) it was built for
+        self._view = None
+        self._view_key = None
+
+    def move(self, dx, dy, dz):
+        self.position.x += dx
+        self.position.y += dy
+        self.position.z += dz
+
+    def rotate(self, dx, dy, dz):
+        self.rotation.x += dx
+        self.rotation.y += dy
+        self.rotation.z += dz
+
+    def view_matrix(self) -> np.ndarray:
+        """Read-only world to view space 4x4 matrix, rebuilt only after the camera moved or turned"""
+        p, r = self.position, self.rotation
+        key = (p.x, p.y, p.z, r.x, r.y, r.z)
+        if key != self._view_key:
+            # Inverse of the camera's own T * R: R transposed, then -R^T * position
+            rotation = np.array(euler_rotation(r.x, r.y, r.z), dtype=np.float64)
+            view = np.identity(4)
+            view[:3, :3] = rotation.T
+            view[:3, 3] = -rotation.T @ np.array(key[:3], dtype=np.float64)
+            view.flags.writeable = False
+            self._view, self._view_key = view, key
+        return self._view
+
+    def forward(self) -> np.ndarray:
+        """World-space unit vector the camera looks along"""
+        return self.view_matrix()[2, :3].copy()
+
+
 class ProjectionManager:
-    def __init__(self, width, height):
+    """
+    Maps view space to clip space with a 4x4 projection matrix. The
+    renderer fuses it with the camera and model matrices into one MVP
+    matrix, so vertices reach clip space in a single matmul; project_array
+    then divides by w and applies the viewport map.
+    """
+
+    def __init__(self, width, height, camera: Camera = None):
         self.width = width
         self.height = height
         self.center_x = width // 2
         self.center_y = height // 2
-    
-    def world_to_screen(self, point: Vector3) -> Tuple[int, int]:
-        """Convert world coordinates to screen coordinates"""
-        screen_x = int(self.center_x + point.x)
-        screen_y = int(self.center_y - point.y)  # Flip Y axis
-        return screen_x, screen_y
+        self.camera = camera or Camera()
+
+    def projection_matrix(self) -> np.ndarray:
+        """View to clip space 4x4 matrix, x / w and y / w span -1 to 1 across the screen"""
+        raise NotImplementedError
+
+    def view_projection_matrix(self) -> np.ndarray:
+        """World to clip space matrix, the model matrix goes on its right"""
+        return self.projection_matrix() @ self.camera.view_matrix()
+
+    def project(self, vertices: List[Vector3]) -> List[Tuple[int, int]]:
+        """Project world-space vertices to screen points, (0, 0) where that is not possible"""
+        vertex_array = np.array([v.to_numpy() for v in vertices], dtype=np.float64).reshape(-1, 4)
+        points, _ = self.project_array(vertex_array @ self.view_projection_matrix().T)
+        return [tuple(point) for point in points.tolist()]
+
+    def viewport_array(self, x: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Map normalized device x and y to an (N, 2) int32 array of screen
+        coordinates and a mask of points that could be converted.
+        """
+        screen = np.empty((len(x), 2), dtype=np.float64)
+        np.multiply(x, self.width / 2, out=screen[:, 0])
+        np.multiply(y, -self.height / 2, out=screen[:, 1])  # Flip Y axis
+        screen += (self.center_x, self.center_y)
+
+        valid = np.all(np.abs(screen) < SCREEN_COORD_LIMIT, axis=1)
+        screen[~valid] = 0
+        # Casting truncates towards zero
+        return screen.astype(np.int32), valid
+
+    def project_array(self, clip_vertices: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Project (N, 4) clip space vertices, returning (N, 2) int32 points and a validity mask"""
+        raise NotImplementedError
+
+    def frustum_planes(self, margin: float = 0) -> np.ndarray:
+        """
+        (P, 4) world-space planes (nx, ny, nz, d) with unit normals; a point
+        p is inside the view volume grown by margin pixels when
+        n . p + d >= 0 for all
+        """
+        # Rows of the view-projection matrix combine into clip space planes
+        # (x >= left * w and so on) expressed in world coordinates
+        rows = self.view_projection_matrix()
+        half_width, half_height = self.width / 2, self.height / 2
+        left = (self.center_x + margin) / half_width
+        right = (self.width - self.center_x + margin) / half_width
+        top = (self.center_y + margin) / half_height
+        bottom = (self.height - self.center_y + margin) / half_height
+        planes = np.stack([
+            rows[0] + left * rows[3],
+            right * rows[3] - rows[0],
+            top * rows[3] - rows[1],
+            rows[1] + bottom * rows[3],
+        ])
+        return planes / np.linalg.norm(planes[:, :3], axis=1, keepdims=True)
+
+    def spheres_visible(self, centers: np.ndarray, radii: np.ndarray, margin: float = 0) -> np.ndarray:
+        """Mask of (K, 3) world-space spheres that may touch the screen"""
+        planes = self.frustum_planes(margin)
+        distances = centers @ planes[:, :3].T + planes[:, 3]
+        return np.all(distances >= -np.asarray(radii)[:, None], axis=1)
+
+    def boxes_visible(self, mins: np.ndarray, maxs: np.ndarray, margin: float = 0) -> np.ndarray:
+        """Mask of (K, 3) world-space axis-aligned boxes that may touch the screen"""
+        planes = self.frustum_planes(margin)
+        # Test the corner of each box furthest along each plane normal
+        positive = planes[:, :3] > 0
+        corners = np.where(positive[None, :, :], maxs[:, None, :], mins[:, None, :])
+        distances = np.einsum("kpi,pi->kp", corners, planes[:, :3]) + planes[:, 3]
+        return np.all(distances >= 0, axis=1)
+
+    def projected_radius(self, centers: np.ndarray, radii: np.ndarray) -> np.ndarray:
+        """On-screen radius in pixels of (K, 3) world-space spheres"""
+        raise NotImplementedError
+
+    def depth_keys(self, clip_vertices: np.ndarray) -> np.ndarray:
+        """
+        (N,) keys growing with distance from the viewer that interpolate
+        linearly across the screen, for depth testing
+        """
+        raise NotImplementedError
+
+    def eye_point(self) -> np.ndarray:
+        """
+        Homogeneous world-space (4,) position of the viewer, w = 0 for a
+        direction when the view rays are parallel. A surface through p
+        with normal n faces the viewer when n . (eye.xyz - eye.w * p) > 0.
+        """
+        raise NotImplementedError
+
+    def project_edges(self, clip_vertices: np.ndarray, edges: np.ndarray, with_depth: bool = False):
+        """
+        Project clip space vertices for drawing edges. Returns (points,
+        valid, edges) where edges only reference valid points. points may
+        have extra rows past the input vertices for endpoints created by
+        clipping. with_depth appends the depth_keys() of every point.
+        """
+        points, valid = self.project_array(clip_vertices)
+        edges = edges[valid[edges[:, 0]] & valid[edges[:, 1]]]
+        if with_depth:
+            return points, valid, edges, self.depth_keys(clip_vertices)
+        return points, valid, edges
 
 class OrthographicProjection(ProjectionManager):
-    def __init__(self, width, height, scale = 100):
-        super().__init__(width, height)
+    def __init__(self, width, height, scale = 100, camera: Camera = None):
+        super().__init__(width, height, camera)
         self.scale = scale
-    
-    def project(self, vertices: List[Vector3]) -> List[Tuple[int, int]]:
-        """Project 3D vertices to 2D using orthographic projection"""
-        projected = []
-        for vertex in vertices:
-            # For orthographic projection, we simply ignore Z coordinate
-            # and scale the X and Y coordinates
-            x = vertex.x * self.scale
-            y = vertex.y * self.scale
-            screen_pos = self.world_to_screen(Vector3(x, y, 0))
-            projected.append(screen_pos)
-        return projected
+
+    def projection_matrix(self) -> np.ndarray:
+        # scale pixels per unit in x and y; view depth passes through as z
+        # since an orthographic view is unbounded in depth, w stays 1
+        return np.array([
+            [self.scale / (self.width / 2), 0, 0, 0],
+            [0, self.scale / (self.height / 2), 0, 0],
+            [0, 0, 1, 0],
+            [0, 0, 0, 1],
+        ], dtype=np.float64)
+
+    def project_array(self, clip_vertices: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        # w is always 1, the divide is a no-op
+        return self.viewport_array(clip_vertices[:, 0], clip_vertices[:, 1])
+
+    def projected_radius(self, centers: np.ndarray, radii: np.ndarray) -> np.ndarray:
+        return np.asarray(radii, dtype=np.float64) * self.scale
+
+    def depth_keys(self, clip_vertices: np.ndarray) -> np.ndarray:
+        # Clip z is the view depth
+        return clip_vertices[:, 2].astype(np.float64)
+
+    def eye_point(self) -> np.ndarray:
+        # Infinitely far back along the view direction
+        return np.append(-self.camera.forward(), 0.0)
 
 class PerspectiveProjection(ProjectionManager):
-    def __init__(self, width, height, fov = 60, near = 0.1, far = 1000):
-        super().__init__(width, height)
+    def __init__(self, width, height, fov = 60, near = 0.1, far = 1000, camera: Camera = None):
+        super().__init__(width, height, camera)
+        # Vertical field of view
         self.fov = math.radians(fov)
         self.near = near
         self.far = far
         self.aspect_ratio = width / height
-        self.scale = min(width, height) // 3
-        # Camera is positioned at a distance where objects are visible
-        self.camera_z = 8.0
-    
-    def project(self, vertices: List[Vector3]) -> List[Tuple[int, int]]:
-        """Project 3D vertices to 2D using perspective projection"""
-        projected = []
-        
-        for vertex in vertices:
-            # Position vertex relative to camera (camera is at positive Z looking towards negative Z)
-            z = self.camera_z + vertex.z  # Camera at +8, objects around 0
-            
-            # Avoid division by zero and ensure positive depth
-            if z <= 0.1:
-                z = 0.1
-            
-            # Simple perspective projection formula: screen_coord = (world_coord / z) * distance
-            perspective_factor = self.scale / z
-            projected_x = vertex.x * perspective_factor
-            projected_y = vertex.y * perspective_factor
-            
-            screen_pos = self.world_to_screen(Vector3(projected_x, projected_y, 0))
-            projected.append(screen_pos)
-        
-        return projected
 
-class Camera:
-    def __init__(self, position: Vector3 = None):
-        self.position = position or Vector3(0, 0, 8)
-        self.rotation = Vector3(0, 0, 0)
-    
-    def move(self, dx, dy, dz):
-        self.position.x += dx
-        self.position.y += dy
-        self.position.z += dz
-    
-    def rotate(self, dx, dy, dz):
-        self.rotation.x += dx
-        self.rotation.y += dy
-        self.rotation.z += dz
\ No newline at end of file
+    def focal_length(self) -> float:
+        """Pixels per unit of x / depth or y / depth on screen"""
+        return self.height / 2 / math.tan(self.fov / 2)
+
+    def projection_matrix(self) -> np.ndarray:
+        # w is the view depth, z / w runs from -1 at near to 1 at far
+        f = 1 / math.tan(self.fov / 2)
+        near, far = self.near, self.far
+        return np.array([
+            [f / self.aspect_ratio, 0, 0, 0],
+            [0, f, 0, 0],
+            [0, 0, (far + near) / (far - near), -2 * far * near / (far - near)],
+            [0, 0, 1, 0],
+        ], dtype=np.float64)
+
+    def project_array(self, clip_vertices: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Project (N, 4) clip space vertices, returning (N, 2) int32 points
+        and a validity mask. Vertices at or behind the near plane are invalid.
+        """
+        w = clip_vertices[:, 3]
+        in_front = w > self.near
+
+        inverse_w = 1.0 / np.where(in_front, w, self.near)
+        points, valid = self.viewport_array(
+            clip_vertices[:, 0] * inverse_w, clip_vertices[:, 1] * inverse_w
+        )
+        return points, valid & in_front
+
+    def projected_radius(self, centers: np.ndarray, radii: np.ndarray) -> np.ndarray:
+        # Spheres reaching the near plane are treated as filling the screen
+        view = self.camera.view_matrix()
+        depth = np.maximum(centers @ view[2, :3] + view[2, 3], self.near)
+        return np.asarray(radii, dtype=np.float64) * self.focal_length() / depth
+
+    def depth_keys(self, clip_vertices: np.ndarray) -> np.ndarray:
+        # 1 / depth is what interpolates linearly in screen space
+        depth = np.maximum(clip_vertices[:, 3], self.near)
+        return -1.0 / depth
+
+    def eye_point(self) -> np.ndarray:
+        position = self.camera.position
+        return np.array([position.x, position.y, position.z, 1.0])
+
+    def frustum_planes(self, margin: float = 0) -> np.ndarray:
+        # Side planes plus near <= w <= far
+        rows = self.view_projection_matrix()
+        depth = np.stack([
+            rows[3] - [0, 0, 0, self.near],
+            [0, 0, 0, self.far] - rows[3],
+        ])
+        depth /= np.linalg.norm(depth[:, :3], axis=1, keepdims=True)
+        return np.concatenate([super().frustum_planes(margin), depth])
+
+    def clip_near(self, clip_vertices: np.ndarray, edges: np.ndarray):
+        """
+        Clip edges against the near plane in clip space, where w is the
+        view depth. Edges entirely behind it are dropped, crossing edges
+        get a new endpoint on the plane appended to the vertex array.
+        """
+        depth = clip_vertices[:, 3]
+        plane = self.near * (1 + NEAR_CLIP_EPSILON)
+        behind = depth[edges] < plane
+
+        crossing = behind[:, 0] != behind[:, 1]
+        kept_edges = edges[~behind.any(axis=1)]
+        if not crossing.any():
+            return clip_vertices, kept_edges
+
+        crossing_edges = edges[crossing]
+        first_behind = behind[crossing, 0]
+        front = np.where(first_behind, crossing_edges[:, 1], crossing_edges[:, 0])
+        back = np.where(first_behind, crossing_edges[:, 0], crossing_edges[:, 1])
+
+        # Clip coordinates are linear in world space, so interpolate them directly
+        t = (plane - depth[front]) / (depth[back] - depth[front])
+        clipped = clip_vertices[front] + t[:, None] * (clip_vertices[back] - clip_vertices[front])
+
+        new_indices = np.arange(len(clip_vertices), len(clip_vertices) + len(clipped))
+        clip_vertices = np.concatenate([clip_vertices, clipped])
+        edges = np.concatenate([
+            kept_edges, np.stack([front, new_indices], axis=1).astype(edges.dtype)
+        ])
+        return clip_vertices, edges
+
+    def project_edges(self, clip_vertices: np.ndarray, edges: np.ndarray, with_depth: bool = False):
+        """project_edges with near plane clipping before the perspective divide"""
+        clip_vertices, edges = self.clip_near(clip_vertices, edges)
+        return super().project_edges(clip_vertices, edges, with_depth)
@@ -1,11 +1,75 @@
 import pygame
 from objects import Object3D
-from transformations import TransformManager
-from projections import OrthographicProjection, PerspectiveProjection
+from transformations import TransformManager, VertexBuffer
+from scene import BoundingVolumeHierarchy, world_bounding_boxes
+from projections import Camera, OrthographicProjection, PerspectiveProjection
+from profiler import FrameProfiler
+from depth import DepthBuffer
+from functools import lru_cache
 from typing import Tuple
+import numpy as np
+import weakref
 import math
 
+
+def _disc(diameter: int) -> np.ndarray:
+    """(K, 2) offsets of the pixels whose centers lie in a disc diameter pixels across"""
+    # Odd diameters center on a pixel, even ones on a pixel corner
+    span = np.arange(diameter) - diameter // 2
+    centers = np.arange(diameter) - (diameter - 1) / 2
+    dx, dy = np.meshgrid(span, span, indexing="ij")
+    cx, cy = np.meshgrid(centers, centers, indexing="ij")
+    inside = cx * cx + cy * cy <= diameter * diameter / 4
+    return np.stack([dx[inside], dy[inside]], axis=1).astype(np.int32)
+
+
+@lru_cache(maxsize=None)
+def brush_kernels(diameter: int):
+    """
+    Offsets for stamping a disc brush along DDA pixels: the (K, 2) disc
+    and, per line class (see LineRenderer.line_classes), the (12, M, 2)
+    offsets the disc gains over the disc at the previous pixel, zero padded,
+    with (12,) counts. Consecutive DDA pixels move one step along the major
+    axis and zero or one along the minor axis, so those edges cover both.
+    """
+    disc = _disc(diameter)
+    covered = set(map(tuple, disc.tolist()))
+    edges = []
+    for x_major in (0, 1):
+        for major_sign in (-1, 1):
+            for minor_sign in (-1, 0, 1):
+                major = (major_sign, 0) if x_major else (0, major_sign)
+                minor = (0, minor_sign) if x_major else (minor_sign, 0)
+                steps = {major, (major[0] + minor[0], major[1] + minor[1])}
+                edge = [offset for offset in disc.tolist()
+                        if any((offset[0] + sx, offset[1] + sy) not in covered for sx, sy in steps)]
+                edges.append(edge)
+
+    leading = np.zeros((len(edges), max(len(edge) for edge in edges), 2), dtype=np.int32)
+    for i, edge in enumerate(edges):
+        leading[i, :len(edge)] = edge
+    counts = np.array([len(edge) for edge in edges], dtype=np.int64)
+    return disc, leading, counts
+
+
+@lru_cache(maxsize=None)
+def marker_kernel(radius: int) -> np.ndarray:
+    """(K, 2) pixel offsets pygame.draw.circle fills around its center for radius"""
+    # Taken from pygame itself so markers match the per-vertex circles exactly
+    size = 2 * radius + 3
+    stamp = pygame.Surface((size, size), depth=8)
+    pygame.draw.circle(stamp, 1, (radius + 1, radius + 1), radius)
+    xs, ys = np.nonzero(pygame.surfarray.array2d(stamp))
+    return (np.stack([xs, ys], axis=1) - (radius + 1)).astype(np.int32)
+
 class LineRenderer:
+    # Upper bound on DDA samples generated per block, keeps memory flat for long lines
+    MAX_BLOCK_SAMPLES = 1 << 21
+    
+    def __init__(self):
+        # Float coverage per pixel for anti-aliased drawing, reused between frames
+        self._coverage = None
+
     @staticmethod
     def dda_line(surface, start: Tuple[int, int], end: Tuple[int, int], 
                  color: Tuple[int, int, int] = (255, 255, 255)):
@@ -51,52 +115,441 @@ class LineRenderer:
             LineRenderer.dda_line(surface, start, end, color)
             return
         
-        x1, y1 = start
-        x2, y2 = end
+        # A round brush stamped along one DDA pass, no gaps on diagonals
+        xs, ys = LineRenderer.thick_line_pixels(
+            np.array([start], dtype=np.int64), np.array([end], dtype=np.int64),
+            surface.get_width(), surface.get_height(), width
+        )
+        if len(xs):
+            LineRenderer.scatter_pixels(surface, xs, ys, color)
+    
+    def draw_line(self, surface, start, end, color = (255, 255, 255), width = 1):
+        # Clipped to the surface, only the visible part of the line is walked
+        self.draw_lines(surface, [start], [end], color, width)
+    
+    @staticmethod
+    def dda_pixels(starts, ends, width, height, area = None, with_samples = False):
+        """
+        Vectorized DDA over many lines at once. Returns the x and y pixel
+        coordinates inside a width x height area that dda_line would draw,
+        optionally only those inside area (left, top, right, bottom).
+        Lines starting on screen match dda_line exactly; a line entering
+        from off screen starts at x1 + first * x_inc instead of summing
+        the skipped steps, so it can be one pixel off along its path.
+        with_samples also returns each pixel's line index and DDA step, the
+        pixels of a line coming in step order.
+        """
+        starts = np.asarray(starts, dtype=np.int64).reshape(-1, 2)
+        ends = np.asarray(ends, dtype=np.int64).reshape(-1, 2)
+        delta = ends - starts
+        steps = np.abs(delta).max(axis=1)
         
-        # Calculate perpendicular offset for thickness
-        dx = x2 - x1
-        dy = y2 - y1
-        length = math.sqrt(dx*dx + dy*dy)
+        # Zero-length lines draw nothing, same as dda_line
+        drawn = steps > 0
+        line_ids = np.flatnonzero(drawn)
+        starts, delta, steps = starts[drawn], delta[drawn], steps[drawn]
+        increments = delta / steps[:, None]
         
-        if length == 0:
-            return
+        # Only walk the steps that can land inside the area. A line that
+        # starts on screen keeps its exact x += x_inc accumulation, one that
+        # enters from outside starts at x1 + first * x_inc
+        first, last = LineRenderer.visible_steps(starts, increments, steps, width, height)
+        if area is None:
+            area = (0, 0, width, height)
+        else:
+            # Still start where the full area clip starts so the accumulated
+            # positions match, but stop at the end of the sub-area
+            left, top, right, bottom = area
+            area_first, area_last = LineRenderer.visible_steps(
+                starts - [left, top], increments, steps, right - left, bottom - top
+            )
+            last = np.where(area_first <= area_last, np.minimum(last, area_last), -1)
+        visible = first <= last
+        first, last = first[visible], last[visible]
+        starts = starts[visible] + first[:, None] * increments[visible]
+        increments = increments[visible]
+        line_ids, skipped = line_ids[visible], first
+        steps = last - first
+        
+        xs, ys = [np.empty(0, dtype=np.int64)], [np.empty(0, dtype=np.int64)]
+        lines, positions = [np.empty(0, dtype=np.int64)], [np.empty(0, dtype=np.int64)]
+        
+        # Group lines by power-of-two sample count so the padded
+        # (lines, samples) blocks waste at most half of their cells
+        buckets = np.ceil(np.log2(steps + 1)).astype(np.int64)
+        for bucket in np.unique(buckets):
+            members = np.flatnonzero(buckets == bucket)
+            row_length = 1 << int(bucket)
+            rows = max(1, LineRenderer.MAX_BLOCK_SAMPLES // row_length)
+            for first in range(0, len(members), rows):
+                chunk = members[first:first + rows]
+                samples = [] if with_samples else None
+                LineRenderer._dda_block(
+                    starts[chunk], increments[chunk], steps[chunk],
+                    row_length, area, xs, ys, samples
+                )
+                for row, step in samples or ():
+                    lines.append(chunk[row])
+                    positions.append(step)
         
-        # Normalize and perpendicular vector
-        ux = -dy / length
-        uy = dx / length
+        if not with_samples:
+            return np.concatenate(xs), np.concatenate(ys)
+        lines = np.concatenate(lines)
+        return (np.concatenate(xs), np.concatenate(ys), line_ids[lines],
+                skipped[lines] + np.concatenate(positions))
+    
+    @staticmethod
+    def visible_steps(starts, increments, steps, width, height):
+        """
+        Liang-Barsky clipping on the DDA step index. Returns the first and
+        last step of each line whose sample can round into the width x height
+        area; lines with first > last are entirely outside.
+        """
+        low = np.zeros(len(steps), dtype=np.float64)
+        high = steps.astype(np.float64)
         
-        # Draw multiple parallel lines for thickness
-        for i in range(width):
-            offset = (i - width//2)
-            offset_x = int(ux * offset)
-            offset_y = int(uy * offset)
+        for axis, size in ((0, width), (1, height)):
+            origin = starts[:, axis].astype(np.float64)
+            increment = increments[:, axis]
+            moving = increment != 0
             
-            new_start = (x1 + offset_x, y1 + offset_y)
-            new_end = (x2 + offset_x, y2 + offset_y)
+            # Samples in [-1, size] may round onto the border pixels
+            enter = np.divide(-1 - origin, increment, out=np.zeros_like(origin), where=moving)
+            leave = np.divide(size - origin, increment, out=np.zeros_like(origin), where=moving)
+            low = np.where(moving, np.maximum(low, np.minimum(enter, leave)), low)
+            high = np.where(moving, np.minimum(high, np.maximum(enter, leave)), high)
             
-            LineRenderer.dda_line(surface, new_start, new_end, color)
+            # A coordinate that never changes is either always in range or never
+            fixed_outside = ~moving & ((origin < -1) | (origin > size))
+            high[fixed_outside] = -1
+        
+        visible = low <= high
+        # Widen by a step to absorb rounding in the divisions above, the
+        # per-pixel bounds check drops anything extra
+        first = np.maximum(np.floor(low) - 1, 0).astype(np.int64)
+        last = np.minimum(np.ceil(high) + 1, steps).astype(np.int64)
+        last[~visible] = -1
+        return first, last
     
-    def draw_line(self, surface, start, end, color = (255, 255, 255), width = 1):
-        # Check if points are reasonable (not too far off-screen)
+    @staticmethod
+    def _dda_block(starts, increments, steps, row_length, area, xs, ys, samples = None):
+        """
+        Rasterize lines of up to row_length samples, appending the pixels
+        inside area (left, top, right, bottom) to xs/ys and, if samples is
+        a list, their (row, step index) arrays to it
+        """
+        left, top, right, bottom = area
+        columns = max(1, LineRenderer.MAX_BLOCK_SAMPLES // len(starts))
+        # Axis 0 is x/y so each line's samples are contiguous for the cumsum
+        position = starts.T.astype(np.float64)
+        increments = increments.T
+        
+        for first_column in range(0, row_length, columns):
+            count = min(columns, row_length - first_column)
+            block = np.empty((2, len(starts), count), dtype=np.float64)
+            block[:] = increments[:, :, None]
+            
+            # np.cumsum adds sequentially along the axis, which reproduces
+            # the repeated x += x_inc of dda_line bit for bit
+            if first_column == 0:
+                block[:, :, 0] = position
+            else:
+                block[:, :, 0] += position
+            np.cumsum(block, axis=2, out=block)
+            position = block[:, :, -1].copy()
+            
+            step_index = np.arange(first_column, first_column + count)
+            used = step_index[None, :] <= steps[:, None]
+            if not used.any():
+                break
+            
+            # np.rint rounds half to even, like Python's round()
+            px = np.rint(block[0][used]).astype(np.int64)
+            py = np.rint(block[1][used]).astype(np.int64)
+            inside = (px >= left) & (px < right) & (py >= top) & (py < bottom)
+            xs.append(px[inside])
+            ys.append(py[inside])
+            if samples is not None:
+                # Boolean indexing walks used in the same row-major order
+                row, column = np.nonzero(used)
+                samples.append((row[inside], step_index[column[inside]]))
+    
+    @staticmethod
+    def scatter_pixels(surface, xs, ys, color):
+        """Write color to all (xs, ys) pixels with a single indexed write"""
+        if surface.get_bytesize() == 3:
+            # 24-bit surfaces have no 2D integer pixel view
+            pixels = pygame.surfarray.pixels3d(surface)
+            pixels[xs, ys] = color[:3]
+        else:
+            pixels = pygame.surfarray.pixels2d(surface)
+            pixels[xs, ys] = surface.map_rgb(color)
+        # Release the surface lock held by the pixel view
+        del pixels
+    
+    @staticmethod
+    def line_classes(starts, ends):
+        """
+        Brush class of each line, 6 * x_major + 3 * (major step > 0) +
+        sign of minor delta + 1, indexing brush_kernels
+        """
+        delta = ends - starts
+        x_major = np.abs(delta[:, 0]) >= np.abs(delta[:, 1])
+        major = np.where(x_major, delta[:, 0], delta[:, 1])
+        minor = np.where(x_major, delta[:, 1], delta[:, 0])
+        return 6 * x_major + 3 * (major > 0) + np.sign(minor) + 1
+    
+    @staticmethod
+    def brush_centers(starts, ends, width, height, line_width, area = None):
+        """
+        dda_pixels with samples for lines line_width wide: the center pixels
+        whose brush can reach the width x height area (or sub-area), which
+        may lie up to the brush radius outside it
+        """
+        pad = line_width // 2 + 1
+        if area is None:
+            area = (0, 0, width, height)
+        left, top, right, bottom = area
+        xs, ys, lines, steps = LineRenderer.dda_pixels(
+            starts + pad, ends + pad, width + 2 * pad, height + 2 * pad,
+            area=(left, top, right + 2 * pad, bottom + 2 * pad), with_samples=True
+        )
+        return xs - pad, ys - pad, lines, steps
+    
+    @staticmethod
+    def stamp_brush(xs, ys, lines, steps, classes, line_width, area):
+        """
+        Stamp a disc line_width across at DDA center pixels in step order,
+        returning the covered pixels inside area (left, top, right, bottom).
+        A pixel that follows its line's previous pixel only adds the edge of
+        the brush that is new, so each pixel costs O(line_width), not its
+        square, and diagonals get no gaps.
+        """
+        disc, leading, counts = brush_kernels(int(line_width))
+        # Full brush wherever the previous step of the same line was not drawn
+        full = np.ones(len(xs), dtype=bool)
+        full[1:] = (lines[1:] != lines[:-1]) | (steps[1:] != steps[:-1] + 1)
+        pixel_class = np.where(full, -1, classes[lines])
+        # Screen coordinates fit in 32 bits, halving the traffic of the stamps
+        xs, ys = xs.astype(np.int32), ys.astype(np.int32)
+        
+        out_x, out_y = [np.empty(0, dtype=np.int32)], [np.empty(0, dtype=np.int32)]
+        # One pass per class so every pixel of a pass shares its kernel
+        for brush_class in range(-1, len(counts)):
+            members = np.flatnonzero(pixel_class == brush_class)
+            if not len(members):
+                continue
+            kernel = disc if brush_class < 0 else leading[brush_class, :counts[brush_class]]
+            LineRenderer._stamp(xs[members], ys[members], kernel, area, out_x, out_y)
+        return np.concatenate(out_x), np.concatenate(out_y)
+    
+    @staticmethod
+    def _stamp(xs, ys, kernel, area, out_x, out_y):
+        """Append every (xs, ys) pixel plus each (M, 2) kernel offset, clipped to area"""
+        left, top, right, bottom = area
+        reach = int(np.abs(kernel).max()) if len(kernel) else 0
+        # Only kernels near the area border need clipping
+        interior = ((xs >= left + reach) & (xs < right - reach) &
+                    (ys >= top + reach) & (ys < bottom - reach))
+        rows = max(1, LineRenderer.MAX_BLOCK_SAMPLES // max(len(kernel), 1))
+        for clipped, members in ((False, np.flatnonzero(interior)), (True, np.flatnonzero(~interior))):
+            for first in range(0, len(members), rows):
+                block = members[first:first + rows]
+                px = xs[block, None] + kernel[:, 0]
+                py = ys[block, None] + kernel[:, 1]
+                if clipped:
+                    inside = (px >= left) & (px < right) & (py >= top) & (py < bottom)
+                    px, py = px[inside], py[inside]
+                out_x.append(px.ravel())
+                out_y.append(py.ravel())
+    
+    @staticmethod
+    def thick_line_pixels(starts, ends, width, height, line_width, area = None):
+        """Pixels of lines line_width across inside a width x height area (or sub-area)"""
+        xs, ys, lines, steps = LineRenderer.brush_centers(starts, ends, width, height,
+                                                          line_width, area)
+        return LineRenderer.stamp_brush(xs, ys, lines, steps, LineRenderer.line_classes(starts, ends),
+                                        line_width, area or (0, 0, width, height))
+    
+    def draw_lines(self, surface, starts, ends, color = (255, 255, 255), width = 1):
+        """Batched draw_line for (E, 2) arrays of start and end points"""
+        starts = np.asarray(starts, dtype=np.int64).reshape(-1, 2)
+        ends = np.asarray(ends, dtype=np.int64).reshape(-1, 2)
         screen_width = surface.get_width()
         screen_height = surface.get_height()
         
-        # Simple clipping - skip lines that are off screen
-        if (max(start[0], end[0]) < -100 or min(start[0], end[0]) > screen_width + 100 or
-            max(start[1], end[1]) < -100 or min(start[1], end[1]) > screen_height + 100):
+        # No off-screen guard needed, dda_pixels clips every line to the surface
+        if width > 1:
+            xs, ys = self.thick_line_pixels(starts, ends, screen_width, screen_height, width)
+        else:
+            xs, ys = self.dda_pixels(starts, ends, screen_width, screen_height)
+        
+        if len(xs):
+            self.scatter_pixels(surface, xs, ys, color)
+    
+    def draw_lines_depth_tested(self, surface, starts, ends, keys, depth_buffer,
+                                tolerance = 0.0, color = (255, 255, 255), width = 1):
+        """
+        draw_lines keeping only the pixels not behind depth_buffer, with
+        (E, 2) depth keys at the line ends interpolated along each line
+        """
+        starts = np.asarray(starts, dtype=np.int64).reshape(-1, 2)
+        ends = np.asarray(ends, dtype=np.int64).reshape(-1, 2)
+        keys = np.asarray(keys, dtype=np.float64).reshape(-1, 2)
+        screen_width, screen_height = surface.get_size()
+        
+        # Thick lines are depth tested at their center pixels, then stamped
+        if width > 1:
+            xs, ys, lines, steps = self.brush_centers(starts, ends, screen_width,
+                                                      screen_height, width)
+        else:
+            xs, ys, lines, steps = self.dda_pixels(starts, ends, screen_width, screen_height,
+                                                   with_samples=True)
+        fractions = steps / np.abs(ends - starts).max(axis=1)[lines]
+        pixel_keys = keys[lines, 0] + fractions * (keys[lines, 1] - keys[lines, 0])
+        shown = depth_buffer.points_visible(np.stack([xs, ys], axis=1), pixel_keys, tolerance)
+        xs, ys = xs[shown], ys[shown]
+        if width > 1:
+            xs, ys = self.stamp_brush(xs, ys, lines[shown], steps[shown],
+                                      self.line_classes(starts, ends), width,
+                                      (0, 0, screen_width, screen_height))
+        if len(xs):
+            self.scatter_pixels(surface, xs, ys, color)
+    
+    def draw_lines_antialiased(self, surface, starts, ends, color = (255, 255, 255), width = 1):
+        """
+        Batched anti-aliased lines. Coverage of all lines is summed into a
+        float buffer and composited over the surface in a single pass.
+        """
+        screen_width, screen_height = surface.get_size()
+        coverage = self._coverage
+        if coverage is None or coverage.shape != (screen_width * screen_height,):
+            coverage = self._coverage = np.zeros(screen_width * screen_height, dtype=np.float32)
+        
+        touched = self.accumulate_coverage(coverage, starts, ends,
+                                           screen_width, screen_height, width)
+        if touched is None:
             return
+        low, high = touched
+        covered = low + np.flatnonzero(coverage[low:high])
+
+        alpha = np.minimum(coverage[covered], 1.0)[:, None]
+        # Only the touched entries are reset, not the whole buffer
+        coverage[covered] = 0
         
-        self.dda_line_thick(surface, start, end, color, width)
+        pixels = pygame.surfarray.pixels3d(surface)
+        xs, ys = np.divmod(covered, screen_height)
+        background = pixels[xs, ys].astype(np.float32)
+        blended = background + (np.asarray(color[:3], dtype=np.float32) - background) * alpha
+        pixels[xs, ys] = np.rint(blended).astype(np.uint8)
+        del pixels
+    
+    @staticmethod
+    def accumulate_coverage(coverage, starts, ends, width, height, line_width = 1):
+        """
+        Add the box-filtered coverage of lines line_width pixels wide to a
+        flat (width * height) buffer indexed x * height + y. Each step along
+        the major axis covers a span across the minor axis, so one pass draws
+        any width; at width 1 this is Xiaolin Wu's two-pixel coverage.
+        Returns the (low, high) index range that was touched, or None.
+        """
+        starts = np.asarray(starts, dtype=np.float64).reshape(-1, 2)
+        ends = np.asarray(ends, dtype=np.float64).reshape(-1, 2)
+        delta = ends - starts
+        steps = np.abs(delta).max(axis=1)
+        drawn = steps > 0
+        starts, delta, steps = starts[drawn], delta[drawn], steps[drawn]
+        increments = delta / steps[:, None]
+        
+        # Cross-section of the line measured along the minor axis
+        gradient = np.abs(increments).min(axis=1)
+        half_span = line_width * np.sqrt(1 + gradient * gradient) / 2
+        
+        # Clip to the area grown by the widest span
+        pad = int(np.ceil(half_span.max())) + 1 if len(steps) else 0
+        first, last = LineRenderer.visible_steps(starts + pad, increments, steps.astype(np.int64),
+                                                 width + 2 * pad, height + 2 * pad)
+        visible = first <= last
+        starts, increments, half_span = starts[visible], increments[visible], half_span[visible]
+        first, counts = first[visible], (last - first + 1)[visible]
+        # Rows a span can touch per step, the same for every line of the call
+        rows = np.arange(int(np.ceil(2 * half_span.max())) + 2) if len(counts) else None
+        
+        x_major = np.abs(increments[:, 0]) >= np.abs(increments[:, 1])
+        cumulative = np.cumsum(counts)
+        touched = None
+        line_start = 0
+        while line_start < len(counts):
+            # Lines whose samples fit in one block (always at least one line)
+            budget = (cumulative[line_start - 1] if line_start else 0) + \
+                LineRenderer.MAX_BLOCK_SAMPLES // len(rows)
+            line_end = max(line_start + 1, int(np.searchsorted(cumulative, budget, side="right")))
+            lines = np.arange(line_start, line_end)
+            line_start = line_end
+            
+            block_counts = counts[lines]
+            line = np.repeat(lines, block_counts)
+            offsets = np.cumsum(block_counts) - block_counts
+            step = first[line] + np.arange(len(line)) - np.repeat(offsets, block_counts)
+            position = starts[line] + step[:, None] * increments[line]
+            
+            major = np.where(x_major[line], position[:, 0], position[:, 1])
+            minor = np.where(x_major[line], position[:, 1], position[:, 0])
+            major = np.rint(major).astype(np.int64)
+            
+            # Overlap of [minor - half, minor + half] with each pixel row [j - 0.5, j + 0.5]
+            half = half_span[line][:, None]
+            row = np.floor(minor - half[:, 0] + 0.5).astype(np.int64)[:, None] + rows
+            amount = (np.minimum(row + 0.5, minor[:, None] + half) -
+                      np.maximum(row - 0.5, minor[:, None] - half))
+            amount = np.clip(amount, 0.0, 1.0)
+            
+            major = np.broadcast_to(major[:, None], row.shape)
+            horizontal = np.broadcast_to(x_major[line][:, None], row.shape)
+            xs = np.where(horizontal, major, row)
+            ys = np.where(horizontal, row, major)
+            inside = (amount > 0) & (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+            if not inside.any():
+                continue
+            
+            # Sum over just the index range this block hits, not the whole frame
+            index = xs[inside] * height + ys[inside]
+            low, high = int(index.min()), int(index.max()) + 1
+            coverage[low:high] += np.bincount(index - low, weights=amount[inside],
+                                              minlength=high - low)
+            if touched is not None:
+                low, high = min(low, touched[0]), max(high, touched[1])
+            touched = (low, high)
+        
+        return touched
+
 
 class Renderer3D:
+    # Projected pixels per LOD clustering cell at which a level is used
+    LOD_PIXELS_PER_CELL = 2.0
+    # How far (in levels) the ideal LOD must pass a boundary before switching
+    LOD_HYSTERESIS = 0.25
+    # Depth offset of each triangle in pixels of its own depth slope, plus a
+    # fraction of its depth key for faces seen head on
+    DEPTH_SLOPE_TOLERANCE = 0.5
+    DEPTH_RELATIVE_TOLERANCE = 1e-6
+    
     def __init__(self, width: int, height: int):
         self.width = width
         self.height = height
-        self.orthographic = OrthographicProjection(width, height)
-        self.perspective = PerspectiveProjection(width, height)
+        # Both projections view the scene through the same camera
+        self.camera = Camera()
+        self.orthographic = OrthographicProjection(width, height, camera=self.camera)
+        self.perspective = PerspectiveProjection(width, height, camera=self.camera)
         self.current_projection = "orthographic"
         self.line_renderer = LineRenderer()
+        # Clip space vertices, reused across objects and frames
+        self.vertex_buffer = VertexBuffer()
+        # BVH over the last rendered scene's objects, refit while they stay the same
+        self._scene_bvh = None
+        self._bvh_nodes = None
+        # LOD level picked last frame per object or scene node
+        self._lod_levels = weakref.WeakKeyDictionary()
         
         # Rendering options
         self.wireframe_color = (255, 255, 255)
@@ -105,6 +558,20 @@ class Renderer3D:
         self.show_vertices = True
         self.vertex_color = (255, 0, 0)
         self.vertex_size = 3
+        self.frustum_culling = True
+        self.level_of_detail = True
+        self.antialiasing = False
+        # Hide edges behind the object's faces, objects without faces are unaffected
+        self.hidden_line_removal = False
+        # Skip edges that only border faces turned away from the viewer,
+        # meant for closed meshes
+        self.backface_culling = False
+        self.depth_buffer = DepthBuffer()
+        
+        # Stage timings, disabled by default so the hooks cost next to nothing
+        self.profiler = FrameProfiler()
+        # Screen bounding box of everything drawn since take_drawn_rect()
+        self.drawn_rect = None
     
     def set_projection(self, projection_type: str):
         if projection_type in ["orthographic", "perspective"]:
@@ -117,40 +584,307 @@ class Renderer3D:
             return self.perspective
     
     def render_object(self, surface, obj: Object3D, transform_manager: TransformManager):
-        if not obj.vertices:
+        if obj.vertex_count == 0:
+            return
+        
+        # Skip all per-vertex work for objects entirely off-screen
+        matrix = transform_manager.get_combined_matrix().matrix
+        if self.frustum_culling:
+            mins, maxs = world_bounding_boxes([obj], matrix[None])
+            if not self._boxes_visible(mins, maxs)[0]:
+                return
+        
+        level = self.select_lod(obj, obj, matrix)
+        vertex_array, edge_array = obj.get_lod(level)
+        triangles = obj.get_lod_triangles(level) if self.hidden_line_removal else None
+        
+        # Object space straight to clip space through the fused MVP matrix
+        with self.profiler.stage("transform"):
+            mvp = self.get_current_projection().view_projection_matrix() @ matrix
+            clip_vertices = self.vertex_buffer.transform(vertex_array, mvp)
+        if self.backface_culling:
+            edge_array, triangles = self._cull_back_faces(
+                obj, level, matrix[None], edge_array, triangles
+            )
+        self.render_clip_space(surface, clip_vertices, edge_array, triangles)
+    
+    def render_scene(self, surface, root):
+        """Render every object in a scene graph with its cached world matrix"""
+        items = [(node, world.matrix) for node, world in root.traverse()
+                 if node.object is not None and node.object.vertex_count > 0]
+        if self.frustum_culling and items:
+            items = self._cull_scene(items)
+        if self.hidden_line_removal:
+            self._render_scene_hidden(surface, items)
+            return
+        
+        view_projection = self.get_current_projection().view_projection_matrix()
+        for node, world_matrix in items:
+            level = self.select_lod(node, node.object, world_matrix)
+            vertex_array, edge_array = node.object.get_lod(level)
+            with self.profiler.stage("transform"):
+                clip_vertices = self.vertex_buffer.transform(vertex_array,
+                                                             view_projection @ world_matrix)
+            if self.backface_culling:
+                edge_array, _ = self._cull_back_faces(
+                    node.object, level, world_matrix[None], edge_array
+                )
+            self.render_clip_space(surface, clip_vertices, edge_array)
+    
+    def _render_scene_hidden(self, surface, items):
+        """
+        Draw the scene as one merged mesh so every object's faces hide the
+        edges of the others, not just its own
+        """
+        vertex_blocks, edge_blocks, triangle_blocks = [], [], []
+        offset = 0
+        view_projection = self.get_current_projection().view_projection_matrix()
+        for node, world_matrix in items:
+            level = self.select_lod(node, node.object, world_matrix)
+            vertex_array, edge_array = node.object.get_lod(level)
+            with self.profiler.stage("transform"):
+                # Copied, the vertex buffer is reused by the next node
+                clip_vertices = self.vertex_buffer.transform(
+                    vertex_array, view_projection @ world_matrix
+                ).copy()
+            triangles = node.object.get_lod_triangles(level)
+            if self.backface_culling:
+                edge_array, triangles = self._cull_back_faces(
+                    node.object, level, world_matrix[None], edge_array, triangles
+                )
+            vertex_blocks.append(clip_vertices)
+            edge_blocks.append(edge_array + offset)
+            triangle_blocks.append(triangles + offset)
+            offset += len(vertex_array)
+        if not vertex_blocks:
+            return
+        
+        self.render_clip_space(surface, np.concatenate(vertex_blocks),
+                               np.concatenate(edge_blocks), np.concatenate(triangle_blocks))
+    
+    def _cull_back_faces(self, obj: Object3D, level: int, matrices, edges, triangles = None):
+        """
+        Drop the edges and triangles of K instances of an LOD level that face
+        away from the viewer. matrices are the (K, 4, 4) model matrices,
+        edges and triangles the level's arrays repeated per instance with
+        vertex offsets, as render_instanced builds them. Edges lying on no
+        triangle are kept.
+        """
+        with self.profiler.stage("culling"):
+            normals, offsets, pairs, loose = obj.get_lod_culling(level)
+            if not len(normals):
+                return edges, triangles
+            
+            # The facing test n . (eye - p) is unchanged by an affine map, so
+            # move the eye into each instance's object space instead of
+            # transforming every normal and vertex out of it
+            determinant = np.linalg.det(matrices[:, :3, :3])
+            flat = determinant == 0
+            invertible = np.where(flat[:, None, None], np.identity(4), matrices)
+            eye = self.get_current_projection().eye_point()
+            eyes = np.linalg.solve(invertible, np.broadcast_to(eye, (len(matrices), 4))[:, :, None])
+            eyes = eyes[:, :, 0]
+            front = eyes[:, :3] @ normals.T - eyes[:, 3:] * offsets > 0
+            # A flattened instance has no facing, keep all of it
+            front[flat] = True
+            
+            kept = np.repeat(loose[None], len(matrices), axis=0)
+            instance, pair = np.nonzero(front[:, pairs[:, 1]])
+            kept[instance, pairs[pair, 0]] = True
+            edges = edges[kept.ravel()]
+            if triangles is not None:
+                triangles = triangles[front.ravel()]
+        return edges, triangles
+    
+    def select_lod(self, key, obj: Object3D, matrix) -> int:
+        """
+        Pick the coarsest LOD whose clustering cells stay within
+        LOD_PIXELS_PER_CELL on screen, from the projected size of the
+        object's bounding sphere. key (object or scene node) remembers the
+        last level so it only changes once the size moves past a boundary
+        by LOD_HYSTERESIS levels. Large meshes get their levels generated
+        the first time they are drawn.
+        """
+        if not self.level_of_detail:
+            return 0
+        obj.ensure_lods()
+        if obj.lod_count == 1:
+            return 0
+        
+        center, radius = obj.get_bounding_sphere()
+        world_center = matrix[:3, :3] @ center + matrix[:3, 3]
+        world_radius = radius * np.linalg.norm(matrix[:3, :3], axis=0).max()
+        diameter = 2 * self.get_current_projection().projected_radius(
+            world_center[None], [world_radius]
+        )[0]
+        
+        # Level k has LOD_BASE_CELLS / 2 ** (k - 1) cells across the object
+        if diameter <= 0:
+            ideal = float(obj.lod_count - 1)
+        else:
+            cells_needed = diameter / self.LOD_PIXELS_PER_CELL
+            ideal = math.log2(obj.LOD_BASE_CELLS / cells_needed) + 1
+        ideal = min(max(ideal, 0.0), obj.lod_count - 1)
+        
+        level = self._lod_levels.get(key)
+        if (level is None or level >= obj.lod_count or
+                not (level - self.LOD_HYSTERESIS <= ideal < level + 1 + self.LOD_HYSTERESIS)):
+            level = int(ideal)
+            self._lod_levels[key] = level
+        return level
+    
+    def reset_lod_history(self):
+        """Forget the levels picked so far, the next frame selects them without hysteresis"""
+        self._lod_levels.clear()
+
+    def _boxes_visible(self, mins, maxs):
+        # Grow the view volume by what lines and vertex markers can spill over
+        margin = self.line_width + self.vertex_size + 1
+        return self.get_current_projection().boxes_visible(mins, maxs, margin)
+    
+    def _cull_scene(self, items):
+        """Keep the (node, matrix) items whose world bounding box may be visible"""
+        nodes = [node for node, _ in items]
+        matrices = np.array([matrix for _, matrix in items])
+        mins, maxs = world_bounding_boxes([node.object for node in nodes], matrices)
+        
+        if nodes != self._bvh_nodes:
+            self._scene_bvh = BoundingVolumeHierarchy(mins, maxs)
+            self._bvh_nodes = nodes
+        else:
+            self._scene_bvh.refit(mins, maxs)
+        
+        return [items[i] for i in self._scene_bvh.query(self._boxes_visible).tolist()]
+    
+    def render_instanced(self, surface, obj: Object3D, instance_matrices):
+        """
+        Draw K copies of one mesh, one per (K, 4, 4) instance matrix. All K x N
+        vertices are transformed in one batched matmul and all K x E edges
+        are rasterized in a single pass.
+        """
+        instance_matrices = np.asarray(instance_matrices, dtype=np.float64).reshape(-1, 4, 4)
+        if obj.vertex_count == 0 or len(instance_matrices) == 0:
             return
         
-        # Apply transformations
-        transformed_vertices = transform_manager.apply_to_vertices(obj.vertices)
+        with self.profiler.stage("transform"):
+            mvps = self.get_current_projection().view_projection_matrix() @ instance_matrices
+            clip_vertices = self.vertex_buffer.transform_instanced(obj.vertex_array, mvps)
         
-        # Project to 2D
+        # Instance k's vertices start at row k * N of the flattened block
+        offsets = np.arange(len(instance_matrices), dtype=np.int32) * obj.vertex_count
+        edges = (obj.edge_array[None, :, :] + offsets[:, None, None]).reshape(-1, 2)
+        triangles = None
+        if self.hidden_line_removal:
+            triangles = (obj.triangle_array[None, :, :] + offsets[:, None, None]).reshape(-1, 3)
+        if self.backface_culling:
+            edges, triangles = self._cull_back_faces(
+                obj, 0, instance_matrices, edges, triangles
+            )
+        self.render_clip_space(surface, clip_vertices, edges, triangles)
+    
+    def render_clip_space(self, surface, clip_vertices, edges, triangles = None):
+        """
+        Project and draw (N, 4) clip space vertices of the current projection
+        and their (E, 2) edges. With hidden_line_removal, (T, 3) triangles are
+        depth buffered and only the edge pixels in front of them are drawn.
+        """
+        hidden = self.hidden_line_removal and triangles is not None and len(triangles) > 0
+        
+        # Clip edges that cross the near plane, divide by w and map to the viewport
         projection = self.get_current_projection()
-        projected_points = projection.project(transformed_vertices)
-        
-        # Draw edges using DDA algorithm
-        for v1_idx, v2_idx in obj.edges:
-            if (v1_idx < len(projected_points) and v2_idx < len(projected_points)):
-                start_point = projected_points[v1_idx]
-                end_point = projected_points[v2_idx]
-                
-                # Skip off-screen points (marked with -1000, -1000)
-                if (start_point[0] != -1000 and end_point[0] != -1000):
-                    self.line_renderer.draw_line(
-                        surface, start_point, end_point, 
-                        self.wireframe_color, self.line_width
-                    )
-        
-        # Draw vertices if enabled
+        with self.profiler.stage("projection"):
+            if hidden:
+                projected_points, valid, edges, keys = projection.project_edges(
+                    clip_vertices, edges, with_depth=True
+                )
+            else:
+                projected_points, valid, edges = projection.project_edges(clip_vertices, edges)
+        
+        if hidden:
+            with self.profiler.stage("depth"):
+                self._fill_depth_buffer(surface, projected_points, valid, keys, triangles)
+        
+        # Draw all edges in one batched DDA pass
+        starts, ends = projected_points[edges[:, 0]], projected_points[edges[:, 1]]
+        with self.profiler.stage("rasterization"):
+            if hidden:
+                # Coverage blending has no per-pixel depth, hidden lines take precedence
+                self.line_renderer.draw_lines_depth_tested(
+                    surface, starts, ends, keys[edges], self.depth_buffer,
+                    color=self.wireframe_color, width=self.line_width
+                )
+            elif self.antialiasing:
+                self.line_renderer.draw_lines_antialiased(
+                    surface, starts, ends, self.wireframe_color, self.line_width
+                )
+            else:
+                self.line_renderer.draw_lines(
+                    surface, starts, ends, self.wireframe_color, self.line_width
+                )
+        
+        # Draw vertices if enabled, skipping endpoints added by clipping
+        vertex_points = projected_points[:0]
         if self.show_vertices:
-            for point in projected_points:
-                # Skip off-screen points
-                if point[0] != -1000:
-                    pygame.draw.circle(surface, self.vertex_color, 
-                                     point, self.vertex_size)
+            count = len(clip_vertices)
+            shown = valid[:count]
+            if hidden:
+                shown = shown & self.depth_buffer.points_visible(
+                    projected_points[:count], keys[:count]
+                )
+            vertex_points = projected_points[:count][shown]
+            with self.profiler.stage("vertices"):
+                self.draw_vertices(surface, vertex_points)
+        
+        self._extend_drawn_rect(surface, projected_points[edges.ravel()], vertex_points)
     
-    def clear_screen(self, surface):
-        """Clear the screen with background color"""
-        surface.fill(self.background_color)
+    def _fill_depth_buffer(self, surface, points, valid, keys, triangles):
+        """Rasterize the triangles with all corners projected, offset by the depth tolerances"""
+        self.depth_buffer.clear(surface.get_size())
+        triangles = triangles[valid[triangles].all(axis=1)]
+        self.depth_buffer.rasterize(points, keys, triangles, self.DEPTH_SLOPE_TOLERANCE,
+                                    self.DEPTH_RELATIVE_TOLERANCE)
+    
+    def _extend_drawn_rect(self, surface, edge_points, vertex_points):
+        points = np.concatenate([edge_points, vertex_points])
+        if not len(points):
+            return
+        # Thick lines and vertex markers reach past the projected points
+        margin = max(self.line_width, self.vertex_size) + 1
+        size = surface.get_size()
+        low = np.maximum(points.min(axis=0) - margin, 0)
+        high = np.minimum(points.max(axis=0) + margin + 1, size)
+        if (high <= low).any():
+            return
+        
+        rect = pygame.Rect(int(low[0]), int(low[1]), int(high[0] - low[0]), int(high[1] - low[1]))
+        self.drawn_rect = rect if self.drawn_rect is None else self.drawn_rect.union(rect)
+    
+    def take_drawn_rect(self):
+        """Return the bounding rect of what was drawn since the last call (or None) and reset it"""
+        rect, self.drawn_rect = self.drawn_rect, None
+        return rect
+    
+    def draw_vertices(self, surface, points):
+        """Draw a marker at each (N, 2) projected vertex position in one scatter"""
+        points = np.asarray(points, dtype=np.int32).reshape(-1, 2)
+        if not len(points):
+            return
+        kernel = marker_kernel(int(self.vertex_size))
+        if not len(kernel):
+            return
+        xs, ys = [], []
+        LineRenderer._stamp(points[:, 0], points[:, 1], kernel, (0, 0) + surface.get_size(), xs, ys)
+        xs, ys = np.concatenate(xs), np.concatenate(ys)
+        if len(xs):
+            LineRenderer.scatter_pixels(surface, xs, ys, self.vertex_color)
+    
+    def clear_screen(self, surface, rects = None):
+        """Clear the screen, or only the given rects, with background color"""
+        if rects is None:
+            surface.fill(self.background_color)
+            return
+        for rect in rects:
+            surface.fill(self.background_color, rect)
     
     def set_wireframe_color(self, color):
         self.wireframe_color = color
@@ -164,5 +898,23 @@ class Renderer3D:
     def toggle_vertices(self):
         self.show_vertices = not self.show_vertices
     
+    def toggle_antialiasing(self):
+        self.antialiasing = not self.antialiasing
+    
+    def toggle_hidden_line_removal(self):
+        self.hidden_line_removal = not self.hidden_line_removal
+
+    def toggle_backface_culling(self):
+        self.backface_culling = not self.backface_culling
+
     def set_line_width(self, width):
-        self.line_width = max(1, width)
\ No newline at end of file
+        self.line_width = max(1, width)
+
+    def set_parallel_rasterization(self, workers):
+        """Rasterize on a pool of worker processes, 0 or None for a single process"""
+        # Imported lazily so the single process path never loads multiprocessing
+        from parallel import ParallelLineRenderer
+        
+        if isinstance(self.line_renderer, ParallelLineRenderer):
+            self.line_renderer.close()
+        self.line_renderer = ParallelLineRenderer(workers) if workers else LineRenderer()
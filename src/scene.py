@@ -0,0 +1,189 @@
+from math_utils import Matrix4x4
+from objects import Object3D
+from transformations import Transform
+from typing import Iterator, List, Optional, Tuple
+import numpy as np
+
+class SceneNode:
+    """
+    Node of a scene graph. Each node has its own Transform, an optional
+    object to draw and any number of children. World matrices are cached
+    and only recomputed when the node's transform, an ancestor's world
+    matrix, or an explicit mark_dirty() says they are stale.
+    """
+
+    def __init__(self, name: str = "Node", obj: Optional[Object3D] = None,
+                 transform: Optional[Transform] = None):
+        self.name = name
+        self.object = obj
+        self.transform = transform or Transform()
+        self.parent: Optional["SceneNode"] = None
+        self.children: List["SceneNode"] = []
+
+        self._world_matrix = Matrix4x4()
+        self._world_dirty = True
+        # Versions the cached world matrix was built from
+        self._local_version = -1
+        self._parent_version = -1
+        # Bumped whenever the world matrix is recomputed, children compare it
+        self._world_version = 0
+
+    def add_child(self, node: "SceneNode") -> "SceneNode":
+        if node.parent is not None:
+            node.parent.remove_child(node)
+        node.parent = self
+        node.mark_dirty()
+        self.children.append(node)
+        return node
+
+    def remove_child(self, node: "SceneNode"):
+        self.children.remove(node)
+        node.parent = None
+        node.mark_dirty()
+
+    def set_transform(self, transform: Transform):
+        self.transform = transform
+        self.mark_dirty()
+
+    def mark_dirty(self):
+        """Force the world matrix of this node and its subtree to be rebuilt"""
+        self._world_dirty = True
+
+    def _update_world(self, parent_matrix: Optional[Matrix4x4], parent_version: int) -> Matrix4x4:
+        if (self._world_dirty or self.transform._version != self._local_version
+                or parent_version != self._parent_version):
+            local = self.transform.get_matrix().matrix
+            if parent_matrix is None:
+                self._world_matrix.matrix = local.copy()
+            else:
+                self._world_matrix.matrix = parent_matrix.matrix @ local
+
+            self._local_version = self.transform._version
+            self._parent_version = parent_version
+            self._world_version += 1
+            self._world_dirty = False
+        return self._world_matrix
+
+    def get_world_matrix(self) -> Matrix4x4:
+        if self.parent is None:
+            return self._update_world(None, 0)
+        parent_matrix = self.parent.get_world_matrix()
+        return self._update_world(parent_matrix, self.parent._world_version)
+
+    def traverse(self) -> Iterator[Tuple["SceneNode", Matrix4x4]]:
+        """Yield (node, world matrix) for this node and all descendants, parents first"""
+        stack = [(self, self.get_world_matrix())]
+        while stack:
+            node, world = stack.pop()
+            yield node, world
+            for child in reversed(node.children):
+                stack.append((child, child._update_world(world, node._world_version)))
+
+    def objects(self) -> Iterator[Tuple[Object3D, np.ndarray]]:
+        """Yield (object, 4x4 world matrix array) for every node that has an object"""
+        for node, world in self.traverse():
+            if node.object is not None:
+                yield node.object, world.matrix
+
+
+def world_bounding_boxes(objects: List[Object3D], matrices: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """World-space (K, 3) min and max corners of each object's box under its (K, 4, 4) matrix"""
+    boxes = np.array([obj.get_bounding_box() for obj in objects], dtype=np.float64).reshape(-1, 2, 3)
+    centers = (boxes[:, 0] + boxes[:, 1]) / 2
+    extents = (boxes[:, 1] - boxes[:, 0]) / 2
+
+    linear = matrices[:, :3, :3]
+    world_centers = np.einsum("kij,kj->ki", linear, centers) + matrices[:, :3, 3]
+    world_extents = np.einsum("kij,kj->ki", np.abs(linear), extents)
+    return world_centers - world_extents, world_centers + world_extents
+
+
+class BoundingVolumeHierarchy:
+    """
+    Binary tree of axis-aligned boxes over K items, split at the median of
+    the longest axis. The topology is built once; refit() updates the
+    boxes in place when items move without rebuilding the tree.
+    """
+
+    # Items per leaf, more items make a shallower tree with looser boxes
+    LEAF_SIZE = 4
+
+    def __init__(self, mins: np.ndarray, maxs: np.ndarray):
+        self.item_count = len(mins)
+        self.order = np.arange(self.item_count)
+        # Per node: children (-1 for leaves), leaf item range in order, depth
+        left, right, first, count, depth = [], [], [], [], []
+
+        centers = (mins + maxs) / 2
+        stack = [(0, self.item_count, 0, None)]
+        while stack:
+            start, end, level, parent_slot = stack.pop()
+            node = len(left)
+            if parent_slot is not None:
+                parent_slot[0][parent_slot[1]] = node
+            left.append(-1)
+            right.append(-1)
+            first.append(start)
+            count.append(end - start)
+            depth.append(level)
+            if end - start <= self.LEAF_SIZE:
+                continue
+
+            # Median split along the longest axis of the item centers
+            items = self.order[start:end]
+            axis = int(np.argmax(np.ptp(centers[items], axis=0)))
+            middle = (end - start) // 2
+            partition = np.argpartition(centers[items, axis], middle)
+            self.order[start:end] = items[partition]
+            count[node] = 0
+
+            stack.append((start + middle, end, level + 1, (right, node)))
+            stack.append((start, start + middle, level + 1, (left, node)))
+
+        self.left = np.array(left, dtype=np.int64)
+        self.right = np.array(right, dtype=np.int64)
+        self.first = np.array(first, dtype=np.int64)
+        self.count = np.array(count, dtype=np.int64)
+        self.depth = np.array(depth, dtype=np.int64)
+        self.is_leaf = self.left < 0
+        self.node_mins = np.empty((len(left), 3), dtype=np.float64)
+        self.node_maxs = np.empty((len(left), 3), dtype=np.float64)
+        self.refit(mins, maxs)
+
+    def refit(self, mins: np.ndarray, maxs: np.ndarray):
+        """Recompute all node boxes for new item boxes, keeping the tree"""
+        self.item_mins = mins
+        self.item_maxs = maxs
+        leaves = np.flatnonzero(self.is_leaf)
+        ordered_mins = mins[self.order]
+        ordered_maxs = maxs[self.order]
+        self.node_mins[leaves] = np.minimum.reduceat(ordered_mins, self.first[leaves])
+        self.node_maxs[leaves] = np.maximum.reduceat(ordered_maxs, self.first[leaves])
+
+        # Deepest internal nodes first, one vectorized step per level
+        for level in range(int(self.depth.max()) - 1, -1, -1):
+            nodes = np.flatnonzero(~self.is_leaf & (self.depth == level))
+            self.node_mins[nodes] = np.minimum(self.node_mins[self.left[nodes]],
+                                               self.node_mins[self.right[nodes]])
+            self.node_maxs[nodes] = np.maximum(self.node_maxs[self.left[nodes]],
+                                               self.node_maxs[self.right[nodes]])
+
+    def query(self, boxes_visible) -> np.ndarray:
+        """
+        Indices of items whose boxes pass boxes_visible(mins, maxs) -> mask.
+        Subtrees whose node box fails are skipped without testing their items.
+        """
+        frontier = np.zeros(1, dtype=np.int64)
+        candidates = []
+        while len(frontier):
+            frontier = frontier[boxes_visible(self.node_mins[frontier], self.node_maxs[frontier])]
+            leaves = frontier[self.is_leaf[frontier]]
+            for leaf in leaves.tolist():
+                candidates.append(self.order[self.first[leaf]:self.first[leaf] + self.count[leaf]])
+            internal = frontier[~self.is_leaf[frontier]]
+            frontier = np.concatenate([self.left[internal], self.right[internal]])
+
+        if not candidates:
+            return np.empty(0, dtype=np.int64)
+        items = np.sort(np.concatenate(candidates))
+        return items[boxes_visible(self.item_mins[items], self.item_maxs[items])]
@@ -1,5 +1,7 @@
-from math_utils import Matrix4x4, Vector3, degrees_to_radians
+from math_utils import Matrix4x4, Vector3
 from typing import List
+import numpy as np
+import math
 
 
 class Transform:
@@ -7,51 +9,153 @@ class Transform:
         self.translation = Vector3(0, 0, 0)
         self.rotation = Vector3(0, 0, 0)  # Euler angles in degrees
         self.scale = Vector3(1, 1, 1)
-        self._matrix = None
+        # Unit (w, x, y, z) rotation used instead of the Euler angles when set
+        self.quaternion = None
+        # Rebuilt in place, callers holding the matrix always see the latest
+        self._matrix = Matrix4x4()
         self._needs_update = True
+        # Bumped on every change, lets caches built on top of this matrix
+        # (combined matrices, scene node world matrices) detect staleness
+        self._version = 0
+
+    def _mark_changed(self):
+        self._needs_update = True
+        self._version += 1
 
     def set_translation(self, x, y, z):
         self.translation = Vector3(x, y, z)
-        self._needs_update = True
+        self._mark_changed()
 
     def set_rotation(self, x, y, z):
         self.rotation = Vector3(x, y, z)
-        self._needs_update = True
+        self.quaternion = None
+        self._mark_changed()
+
+    def set_quaternion(self, w, x, y, z):
+        """Rotate by a quaternion instead of the Euler angles, normalized here"""
+        norm = math.sqrt(w * w + x * x + y * y + z * z)
+        self.quaternion = (w / norm, x / norm, y / norm, z / norm)
+        self._mark_changed()
 
     def set_scale(self, x, y, z):
         self.scale = Vector3(x, y, z)
-        self._needs_update = True
+        self._mark_changed()
 
     def get_matrix(self) -> Matrix4x4:
-        if self._needs_update or self._matrix is None:
+        if self._needs_update:
             self._update_matrix()
         return self._matrix
 
     def _update_matrix(self):
-        # Create transformation matrices
-        scale_matrix = Matrix4x4.scaling(self.scale.x, self.scale.y, self.scale.z)
-
-        rot_x = Matrix4x4.rotation_x(degrees_to_radians(self.rotation.x))
-        rot_y = Matrix4x4.rotation_y(degrees_to_radians(self.rotation.y))
-        rot_z = Matrix4x4.rotation_z(degrees_to_radians(self.rotation.z))
+        if self.quaternion is None:
+            rotation = euler_rotation(self.rotation.x, self.rotation.y, self.rotation.z)
+        else:
+            rotation = quaternion_rotation(*self.quaternion)
+
+        # T * R * S written out: each rotation column scaled, translation last
+        matrix = self._matrix.matrix
+        sx, sy, sz = self.scale.x, self.scale.y, self.scale.z
+        t = (self.translation.x, self.translation.y, self.translation.z)
+        for i, (r0, r1, r2) in enumerate(rotation):
+            matrix[i, 0] = r0 * sx
+            matrix[i, 1] = r1 * sy
+            matrix[i, 2] = r2 * sz
+            matrix[i, 3] = t[i]
+        self._needs_update = False
 
-        # Combine rotations (Z * Y * X order)
-        rotation_matrix = rot_z.multiply(rot_y.multiply(rot_x))
 
-        translation_matrix = Matrix4x4.translation(
-            self.translation.x, self.translation.y, self.translation.z
-        )
+def euler_rotation(x, y, z):
+    """Rows of Rz * Ry * Rx for angles in degrees, in closed form"""
+    ca, sa = math.cos(math.radians(x)), math.sin(math.radians(x))
+    cb, sb = math.cos(math.radians(y)), math.sin(math.radians(y))
+    cc, sc = math.cos(math.radians(z)), math.sin(math.radians(z))
+    return (
+        (cc * cb, cc * sb * sa - sc * ca, cc * sb * ca + sc * sa),
+        (sc * cb, sc * sb * sa + cc * ca, sc * sb * ca - cc * sa),
+        (-sb, cb * sa, cb * ca),
+    )
+
+
+def quaternion_rotation(w, x, y, z):
+    """Rows of the rotation matrix of a unit quaternion"""
+    return (
+        (1 - 2 * (y * y + z * z), 2 * (x * y - w * z), 2 * (x * z + w * y)),
+        (2 * (x * y + w * z), 1 - 2 * (x * x + z * z), 2 * (y * z - w * x)),
+        (2 * (x * z - w * y), 2 * (y * z + w * x), 1 - 2 * (x * x + y * y)),
+    )
+
+
+def compose_trs_matrices(translations: np.ndarray, quaternions: np.ndarray,
+                         scales: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+    """
+    (K, 4, 4) T * R * S matrices from (K, 3) translations, (K, 4) unit
+    quaternions and (K, 3) scales, written into out when given. Pairs
+    with quaternion_slerp and Renderer3D.render_instanced for animating
+    thousands of transforms without a Transform object each.
+    """
+    quaternions = np.asarray(quaternions, dtype=np.float64).reshape(-1, 4)
+    count = len(quaternions)
+    if out is None:
+        out = np.empty((count, 4, 4), dtype=np.float64)
+    w, x, y, z = quaternions.T
+    scales = np.broadcast_to(np.asarray(scales, dtype=np.float64), (count, 3))
+
+    out[:, 0, 0] = 1 - 2 * (y * y + z * z)
+    out[:, 0, 1] = 2 * (x * y - w * z)
+    out[:, 0, 2] = 2 * (x * z + w * y)
+    out[:, 1, 0] = 2 * (x * y + w * z)
+    out[:, 1, 1] = 1 - 2 * (x * x + z * z)
+    out[:, 1, 2] = 2 * (y * z - w * x)
+    out[:, 2, 0] = 2 * (x * z - w * y)
+    out[:, 2, 1] = 2 * (y * z + w * x)
+    out[:, 2, 2] = 1 - 2 * (x * x + y * y)
+    out[:, :3, :3] *= scales[:, None, :]
+    out[:, :3, 3] = translations
+    out[:, 3, :3] = 0
+    out[:, 3, 3] = 1
+    return out
+
+
+class VertexBuffer:
+    """Reusable output buffer for transforming (N, 4) vertex blocks"""
 
-        # Combine transformations: T * R * S
-        self._matrix = translation_matrix.multiply(
-            rotation_matrix.multiply(scale_matrix)
-        )
-        self._needs_update = False
+    def __init__(self):
+        # Only reallocated when a larger vertex block comes through
+        self._data = np.empty((0, 4), dtype=np.float64)
+
+    def transform(self, vertex_array: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+        """
+        Transform vertex_array by a 4x4 matrix with a single matmul. The
+        result is a view into this buffer, overwritten by the next call.
+        """
+        out = self._reserve(len(vertex_array))
+        np.matmul(vertex_array, matrix.T, out=out)
+        return out
+
+    def transform_instanced(self, vertex_array: np.ndarray, matrices: np.ndarray) -> np.ndarray:
+        """
+        Transform vertex_array by each of K (K, 4, 4) matrices in one batched
+        matmul. Returns a (K * N, 4) view, instance k in rows k*N to (k+1)*N.
+        """
+        count = len(matrices) * len(vertex_array)
+        out = self._reserve(count)
+        np.matmul(vertex_array[None, :, :], matrices.transpose(0, 2, 1),
+                  out=out.reshape(len(matrices), len(vertex_array), 4))
+        return out
+
+    def _reserve(self, count: int) -> np.ndarray:
+        if count > len(self._data):
+            self._data = np.empty((count, 4), dtype=np.float64)
+        return self._data[:count]
 
 
 class TransformManager:
     def __init__(self):
         self.transforms = []
+        self.vertex_buffer = VertexBuffer()
+        # Combined matrix and the (transform, version) list it was built from
+        self._combined = None
+        self._combined_key = None
 
     def add_transform(self, transform: Transform):
         self.transforms.append(transform)
@@ -63,12 +167,30 @@ class TransformManager:
         if not self.transforms:
             return Matrix4x4.identity()
 
+        key = [(t, t._version) for t in self.transforms]
+        if key == self._combined_key:
+            return self._combined
+
         result = self.transforms[0].get_matrix()
         for i in range(1, len(self.transforms)):
             result = result.multiply(self.transforms[i].get_matrix())
 
+        self._combined = result
+        self._combined_key = key
         return result
 
     def apply_to_vertices(self, vertices: List[Vector3]) -> List[Vector3]:
-        matrix = self.get_combined_matrix()
-        return [matrix.multiply(vertex) for vertex in vertices]
+        vertex_array = np.ones((len(vertices), 4), dtype=np.float64)
+        for i, vertex in enumerate(vertices):
+            vertex_array[i, :3] = (vertex.x, vertex.y, vertex.z)
+
+        transformed = self.apply_to_array(vertex_array)
+        return [Vector3(x, y, z) for x, y, z, _ in transformed.tolist()]
+
+    def apply_to_array(self, vertex_array: np.ndarray) -> np.ndarray:
+        """
+        Transform an (N, 4) homogeneous vertex block with a single matmul.
+        The result is a view into a buffer owned by this manager, so it is
+        overwritten by the next call.
+        """
+        return self.vertex_buffer.transform(vertex_array, self.get_combined_matrix().matrix)